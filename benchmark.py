@@ -0,0 +1,219 @@
+"""Headless benchmark of the capture -> process -> display path.
+
+Feeds synthetic or file-backed frames at several resolutions through the
+same Pipeline and VideoWidget code the WebcamTest viewer uses, and
+reports frames per second, per-stage times and peak memory. Results can be
+written as JSON and compared against a previous run to catch regressions.
+
+    python benchmark.py --output results.json
+    python benchmark.py --pipeline pipelines/edges.json --compare results.json
+"""
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtGui import QImage
+from PyQt6.QtCore import PYQT_VERSION_STR
+from PyQt6.QtWidgets import QApplication
+
+from datetime import datetime
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import cv2
+import numpy as np
+
+from frame_pipeline import Pipeline, DEFAULT_PIPELINE
+from frame_sources import synthetic_frames
+from telemetry import percentile
+from video_widget import VideoWidget
+
+RESOLUTIONS = {
+    "480p": (640, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+DISTINCT_FRAMES = 8  # Frames cycled through, so caches never see the same frame twice in a row
+
+
+def file_frames(path, width, height, count=DISTINCT_FRAMES):
+    """Read frames from a video file, resized to the requested resolution.
+
+    At least two frames are needed: the pipeline reuses its outputs for a
+    frame processed twice in a row, so a single one would only measure that.
+    """
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA))
+    cap.release()
+    if len(frames) < 2:
+        raise RuntimeError(f"Could read only {len(frames)} frame(s) from {path}, the benchmark needs at least 2")
+    return frames
+
+
+def summarize(samples):
+    values = sorted(samples)
+    return {
+        "mean": sum(values) / len(values) if values else 0.0,
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+    }
+
+
+def paint(widget, canvas, image):
+    """Hand a frame to the video widget and paint it onto ``canvas``, as the viewer's repaint does."""
+    widget.set_frames([image], [0])
+    widget.render(canvas)
+
+
+def run_case(frames, pipeline, display_size, iterations):
+    """Process and paint ``iterations`` frames, return the measurements."""
+    widget = VideoWidget()
+    widget.resize(*display_size)
+    canvas = QImage(*display_size, QImage.Format.Format_RGB32)
+    stage_samples = {}
+
+    # Warm up OpenCV and the converter buffers outside the measurement
+    for frame in frames[:2]:
+        paint(widget, canvas, pipeline.process(frame))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(iterations):
+        timings = []
+        image = pipeline.process(frames[i % len(frames)], timings)
+
+        display_start = time.perf_counter()
+        paint(widget, canvas, image)
+        timings.append(("display", (time.perf_counter() - display_start) * 1000))
+
+        for name, ms in timings:
+            stage_samples.setdefault(name, []).append(ms)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "frames": iterations,
+        "fps": iterations / elapsed if elapsed > 0 else 0.0,
+        "frame_ms": elapsed * 1000 / iterations,
+        "stages_ms": {name: summarize(samples) for name, samples in stage_samples.items()},
+        "peak_traced_mb": peak / 2**20,
+    }
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process, None where it cannot be read."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def compare(results, baseline, tolerance):
+    """Print the FPS change against a baseline run, return the regressed cases."""
+    previous = {(r["resolution"], r["view"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'case':<22}{'baseline':>10}{'current':>10}{'change':>9}")
+    for result in results:
+        key = (result["resolution"], result["view"])
+        if key not in previous:
+            continue
+        old_fps, new_fps = previous[key]["fps"], result["fps"]
+        change = (new_fps - old_fps) / old_fps if old_fps else 0.0
+        flag = ""
+        if change < -tolerance:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(f"{'/'.join(key):<22}{old_fps:>10.1f}{new_fps:>10.1f}{change:>+9.1%}{flag}")
+    return regressions
+
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pipeline", help="JSON pipeline config file (default: gray, blur, Canny)")
+    parser.add_argument("--views", help="comma separated views to run (default: all views of the pipeline)")
+    parser.add_argument("--resolutions", default=",".join(RESOLUTIONS),
+                        help=f"comma separated subset of {', '.join(RESOLUTIONS)}")
+    parser.add_argument("--video", help="take frames from this video file instead of synthetic ones")
+    parser.add_argument("--frames", type=int, default=200, help="frames per case (default: 200)")
+    parser.add_argument("--display-size", type=parse_size, default=(960, 540),
+                        help="size frames are converted to for display (default: 960x540)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="FPS drop counted as a regression when comparing (default: 0.10)")
+    args = parser.parse_args()
+
+    # Must stay alive while the video widget paints
+    app = QApplication(sys.argv[:1])
+
+    pipeline = Pipeline.from_config(args.pipeline) if args.pipeline else Pipeline.from_dict(DEFAULT_PIPELINE)
+    views = args.views.split(",") if args.views else pipeline.views()
+
+    results = []
+    print(f"{'case':<22}{'fps':>9}{'ms/frame':>10}{'peak MB':>9}  stages (mean ms)")
+    for resolution in args.resolutions.split(","):
+        width, height = RESOLUTIONS[resolution]
+        if args.video:
+            frames = file_frames(args.video, width, height)
+        else:
+            frames = synthetic_frames(width, height, DISTINCT_FRAMES)
+
+        for view in views:
+            pipeline.set_display(view)
+            result = dict(resolution=resolution, view=view,
+                          **run_case(frames, pipeline, args.display_size, args.frames))
+            results.append(result)
+
+            stages = ", ".join(f"{name} {stats['mean']:.2f}" for name, stats in result["stages_ms"].items())
+            print(f"{resolution + '/' + view:<22}{result['fps']:>9.1f}{result['frame_ms']:>10.2f}"
+                  f"{result['peak_traced_mb']:>9.1f}  {stages}")
+
+    report = {
+        "meta": {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "pyqt": PYQT_VERSION_STR,
+            "qt_platform": app.platformName(),
+            "pipeline": pipeline.to_dict()["stages"],
+            "source": args.video or "synthetic",
+            "display_size": list(args.display_size),
+            "peak_rss_mb": peak_rss_mb(),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from collections import namedtuple
+import math
+import os
+import queue
+import sys
+import threading
+import time
+
+from frame_sources import default_backend
+from lazy_import import lazy_import
+from v4l2_devices import list_v4l2_cameras, V4L2_SYSFS_ROOT
+
+cv2 = lazy_import("cv2")
+
+MAX_CAMERA_INDEX = 10       # Check reasonable number of indices
+PROBE_TIMEOUT = 3.0         # Seconds a single index may take before it is given up
+MAX_CONSECUTIVE_MISSES = 3  # Stop probing after this many missing indices in a row
+PROBE_WORKERS = 4
+
+# A working capture index with its best known name and a stable identity:
+# the WMI DeviceID on Windows, the V4L2 bus path on Linux.
+CameraDevice = namedtuple("CameraDevice", "index name device_id")
+
+
+def _probe_index(index, backend, open_only, started):
+    """Open one capture index and report whether it delivers frames."""
+    started[index] = time.monotonic()
+    cap = cv2.VideoCapture(index, backend)
+    try:
+        if not cap.isOpened():
+            return False
+        if open_only:
+            return True
+        ret, _ = cap.read()
+        return ret
+    finally:
+        cap.release()
+
+
+def _probe_worker(indices, limit, backend, open_only, started, finished):
+    """Probe indices from the ``indices`` queue until it is empty or they exceed ``limit[0]``."""
+    while True:
+        try:
+            index = indices.get_nowait()
+        except queue.Empty:
+            return
+        if index > limit[0]:
+            return
+        try:
+            working = bool(_probe_index(index, backend, open_only, started))
+        except Exception:
+            working = False
+        finished.put((index, working))
+
+
+def _miss_cutoff(results, max_index, max_misses):
+    """Return the index after which probing can stop, or None.
+
+    Only the contiguous run of already resolved indices starting at 0 is
+    considered, so a slow index never causes later hits to be dropped.
+    """
+    misses = 0
+    for index in range(max_index):
+        if index not in results:
+            return None
+        misses = 0 if results[index] else misses + 1
+        if misses >= max_misses:
+            return index
+    return None
+
+
+def probe_camera_indices(max_index=MAX_CAMERA_INDEX, backend=None, open_only=False,
+                         timeout=PROBE_TIMEOUT, max_misses=MAX_CONSECUTIVE_MISSES,
+                         workers=PROBE_WORKERS, on_found=None):
+    """Probe capture indices concurrently and return the working ones.
+
+    Each index gets ``timeout`` seconds from the moment its probe starts;
+    slower indices are counted as missing and their threads are abandoned.
+    If every worker hangs, queued indices never start; probing then ends
+    once all indices could have used their time one worker after another.
+    Probes run on daemon threads, so a driver that hangs never keeps the
+    interpreter from exiting. After ``max_misses`` consecutive missing
+    indices the remaining ones are skipped. With ``open_only`` the frame
+    read is skipped. ``on_found`` is called with each working index as soon
+    as it is confirmed. The backend defaults to the one live devices are
+    opened with.
+    """
+    if backend is None:
+        backend = default_backend()
+    started = {}
+    results = {}
+    indices = queue.Queue()
+    for index in range(max_index):
+        indices.put(index)
+    # Highest index the workers may still start, lowered to stop them
+    limit = [max_index]
+    finished = queue.Queue()
+    for number in range(min(workers, max_index)):
+        threading.Thread(target=_probe_worker, name=f"camera-probe-{number}", daemon=True,
+                         args=(indices, limit, backend, open_only, started, finished)).start()
+
+    pending = set(range(max_index))
+    deadline = time.monotonic() + timeout * math.ceil(max_index / max(1, workers))
+    try:
+        while pending:
+            try:
+                done = [finished.get(timeout=0.05)]
+                while True:
+                    done.append(finished.get_nowait())
+            except queue.Empty:
+                pass
+            for index, working in done:
+                # Indices given up on stay missing, even if their probe returns later
+                if index not in pending:
+                    continue
+                pending.discard(index)
+                results[index] = working
+                if working and on_found:
+                    on_found(index)
+
+            # Give up on indices that exceeded their own deadline, or all of them at the overall one
+            now = time.monotonic()
+            for index in list(pending):
+                if now > deadline or (index in started and now - started[index] > timeout):
+                    pending.discard(index)
+                    results[index] = False
+
+            cutoff = _miss_cutoff(results, max_index, max_misses)
+            if cutoff is not None:
+                limit[0] = cutoff
+                pending = {index for index in pending if index <= cutoff}
+    finally:
+        # Workers take no further indices, those still probing are abandoned
+        limit[0] = -1
+
+    return sorted(index for index, working in results.items() if working)
+
+
+def list_wmi_cameras():
+    """Return (name, device_id) for the camera devices known to WMI."""
+    if sys.platform != "win32":
+        return []
+
+    # Importing WMI takes a while, only pay for it when discovery runs
+    import wmi
+    c = wmi.WMI()
+    wmi_devices = c.Win32_PnPEntity(PNPClass="Camera")
+
+    print(f"Found {len(wmi_devices)} imaging devices via WMI:")
+    for i, device in enumerate(wmi_devices):
+        print(f"Device {i}: {device.Name}")
+
+    return [(device.Name, device.DeviceID) for device in wmi_devices]
+
+
+def identify_camera(index, wmi_cameras):
+    """Build the CameraDevice for a working OpenCV index.
+
+    WMI devices are matched by position (imperfect, but provides a guess).
+    Only used where the cameras cannot be listed from V4L2.
+    """
+    if index < len(wmi_cameras):
+        name, device_id = wmi_cameras[index]
+        return CameraDevice(index, name, device_id)
+
+    return CameraDevice(index, f"Unknown Camera {index}", f"index:{index}")
+
+
+def list_camera_devices_wmi(open_only=False, on_camera=None):
+    """List working cameras as CameraDevice tuples.
+
+    ``on_camera`` is called with each CameraDevice as soon as it is confirmed.
+    """
+    wmi_cameras = list_wmi_cameras()
+
+    def found(index):
+        print(f"\nOpenCV camera at index {index} is working")
+        if on_camera:
+            on_camera(identify_camera(index, wmi_cameras))
+
+    indices = probe_camera_indices(open_only=open_only, on_found=found)
+    return [identify_camera(index, wmi_cameras) for index in indices]
+
+
+def list_camera_devices_v4l2(sysfs_root=V4L2_SYSFS_ROOT, on_camera=None):
+    """List the V4L2 capture nodes as CameraDevice tuples, without probing.
+
+    The OpenCV index of /dev/video<n> with the V4L2 backend is n, so no
+    guessing is needed. The device ID is the bus ID of the camera, further
+    capture nodes of the same camera get their position appended.
+    """
+    cameras = []
+    seen = {}
+    for device in list_v4l2_cameras(sysfs_root):
+        device_id = f"v4l2:{device.bus_id}"
+        seen[device_id] = seen.get(device_id, 0) + 1
+        if seen[device_id] > 1:
+            device_id += f":{seen[device_id] - 1}"
+        camera = CameraDevice(device.index, device.name, device_id)
+        cameras.append(camera)
+        if on_camera:
+            on_camera(camera)
+    return cameras
+
+
+def list_camera_devices(open_only=False, on_camera=None):
+    """List the cameras of this machine, from sysfs on Linux, otherwise by probing."""
+    if sys.platform.startswith("linux") and os.path.isdir(V4L2_SYSFS_ROOT):
+        return list_camera_devices_v4l2(on_camera=on_camera)
+    return list_camera_devices_wmi(open_only, on_camera)
+
+
+class DiscoveryWorker(QThread):
+    """Run camera discovery in the background and report cameras as they appear."""
+
+    camera_found = pyqtSignal(object)
+    discovery_finished = pyqtSignal(list)
+
+    def __init__(self, open_only=False, parent=None):
+        super().__init__(parent)
+        self.open_only = open_only
+
+    def run(self):
+        # WMI is COM based and every thread using it needs its own COM apartment
+        if sys.platform == "win32":
+            import pythoncom
+            pythoncom.CoInitialize()
+        try:
+            cameras = list_camera_devices(open_only=self.open_only, on_camera=self.camera_found.emit)
+        finally:
+            if sys.platform == "win32":
+                pythoncom.CoUninitialize()
+        self.discovery_finished.emit(cameras)
@@ -0,0 +1,90 @@
+from collections import deque
+import threading
+import time
+
+from lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
+
+# Properties shown and adjustable in the viewer, name -> cv2 property constant
+PROPERTIES = {
+    "exposure": "CAP_PROP_EXPOSURE",
+    "brightness": "CAP_PROP_BRIGHTNESS",
+    "contrast": "CAP_PROP_CONTRAST",
+}
+POLL_INTERVAL = 1.0    # Seconds between two reads of the same property
+WRITE_DEBOUNCE = 0.2   # Seconds a written value has to rest before it is sent to the device
+
+
+class CameraProperties:
+    """Cached camera properties, read and written on the capture thread.
+
+    Property queries can block for milliseconds on DirectShow and V4L2 and
+    compete with read(), so the GUI never calls the capture itself: it
+    reads the cached ``values`` and queues writes with set(). The capture
+    worker calls service() between frames, which sends the queued writes
+    once no new value arrived for ``debounce`` seconds, only the last value
+    per property, and reads at most one property per call so every one is
+    refreshed about every ``interval`` seconds. Changed values are passed
+    to ``on_change`` as a {name: value} dict, on the capture thread.
+    """
+
+    def __init__(self, properties=PROPERTIES, interval=POLL_INTERVAL, debounce=WRITE_DEBOUNCE, on_change=None,
+                 clock=time.monotonic):
+        self.properties = dict(properties)
+        self.interval = interval
+        self.debounce = debounce
+        self.on_change = on_change
+        self.clock = clock
+        self.values = {}
+        self.reads = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._write_at = 0.0
+        self._due = deque()
+        self._next_round = 0.0
+
+    def get(self, name, default=None):
+        """The cached value of a property, ``default`` until it has been read."""
+        return self.values.get(name, default)
+
+    def set(self, name, value):
+        """Queue a write, later writes of the same property replace it."""
+        if name not in self.properties:
+            raise KeyError(f"Unknown camera property {name!r}")
+        with self._lock:
+            self._pending[name] = value
+            self._write_at = self.clock() + self.debounce
+
+    def service(self, cap):
+        """Send due writes and read the next due property, called on the capture thread."""
+        now = self.clock()
+        with self._lock:
+            writes = {}
+            if self._pending and now >= self._write_at:
+                writes, self._pending = self._pending, {}
+
+        changes = {}
+        for name, value in writes.items():
+            cap.set(getattr(cv2, self.properties[name]), value)
+            self.writes += 1
+            # Read back what the device accepted, it may clamp or ignore the value
+            if name in self._due:
+                self._due.remove(name)
+            self._due.appendleft(name)
+
+        if now >= self._next_round:
+            self._due.extend(name for name in self.properties if name not in self._due)
+            self._next_round = now + self.interval
+        if self._due:
+            name = self._due.popleft()
+            value = cap.get(getattr(cv2, self.properties[name]))
+            self.reads += 1
+            if self.values.get(name) != value:
+                self.values[name] = value
+                changes[name] = value
+
+        if changes and self.on_change:
+            self.on_change(changes)
+        return changes
@@ -0,0 +1,74 @@
+import time
+
+from camera_properties import CameraProperties, POLL_INTERVAL
+from capture_worker import CaptureWorker
+from pipeline_worker import PipelineWorker
+from telemetry import Telemetry
+
+
+class CameraSession:
+    """One running camera: its source, capture and pipeline workers and metrics.
+
+    Every session has its own threads, pipeline copy and telemetry, so
+    several cameras run side by side and a slow one only delays itself.
+    The GUI pulls the newest processed frame with ``latest()``. ``label``
+    names the camera in file names, e.g. of recordings. ``mode`` and
+    ``resolution`` are unknown until the capture worker reports the mode
+    it reads on its thread, the device is not queried from the GUI thread.
+    """
+
+    def __init__(self, camera, cap, pipeline, workers=0, prepare=None, label=None, scheduler=None,
+                 property_interval=POLL_INTERVAL, parent=None):
+        self.camera = camera
+        self.label = label or f"cam{camera.index}"
+        self.cap = cap
+        self.pipeline = pipeline
+        self.telemetry = Telemetry()
+        self.mode = None
+        self.resolution = (0, 0)
+        self.frame_count = 0
+        self.start_time = time.time()
+        self.last_frame = None
+        self.last_timestamp = None
+        self.recorder = None
+        self.pre_trigger = None
+
+        self.capture_worker = CaptureWorker(cap, self.telemetry, prepare, scheduler, parent)
+        # Camera properties are only ever touched on the capture thread
+        self.properties = CameraProperties(interval=property_interval,
+                                           on_change=self.capture_worker.properties_changed.emit)
+        self.capture_worker.properties = self.properties
+        # Process frames on their own thread, or on worker processes
+        self.pipeline_worker = PipelineWorker(self.capture_worker, pipeline, workers, self.telemetry, parent)
+
+    @property
+    def name(self):
+        return self.camera.name
+
+    @property
+    def fps(self):
+        """Frame rate of the capture mode, None until it is known."""
+        return self.mode.fps if self.mode else None
+
+    def start(self):
+        self.capture_worker.start()
+        self.pipeline_worker.start()
+
+    def stop(self):
+        """Stop the workers and release the device."""
+        self.pipeline_worker.stop()
+        self.capture_worker.stop()
+        self.cap.release()
+
+    def latest(self):
+        """Take the newest processed frame, returns its sequence number or None.
+
+        The frame is kept in ``last_frame`` so the display can redraw it
+        without waiting for the camera.
+        """
+        latest = self.pipeline_worker.latest_result()
+        if latest is None:
+            return None
+        seq, self.last_timestamp, self.last_frame = latest
+        self.frame_count += 1
+        return seq
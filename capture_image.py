@@ -1,18 +1,139 @@
-from cv2 import VideoCapture, imwrite, imshow, destroyWindow, waitKey
+from cv2 import VideoCapture, imwrite, imshow, destroyWindow, waitKey, imencode, IMWRITE_PNG_COMPRESSION, IMWRITE_JPEG_QUALITY
+from concurrent.futures import ThreadPoolExecutor
 
-cam_port = 0  # Change this to the correct port if needed
-cam = VideoCapture(cam_port)
+import argparse
+import os
+import threading
+import time
+import numpy as np
 
-result, image = cam.read()
+from frame_sources import open_source
 
-if result:
 
-    imshow("CapturedImage", image)
+def encode_frame(frame, path, image_format, png_level, jpeg_quality):
+    """Encode one frame to disk, returns (bytes written, seconds spent)."""
+    start = time.perf_counter()
+    if image_format == "npy":
+        np.save(path, frame)
+    else:
+        if image_format == "png":
+            params = [IMWRITE_PNG_COMPRESSION, png_level]
+        else:
+            params = [IMWRITE_JPEG_QUALITY, jpeg_quality]
+        ok, data = imencode(f".{image_format}", frame, params)
+        if not ok:
+            raise RuntimeError(f"Could not encode {path}")
+        with open(path, "wb") as f:
+            f.write(data.tobytes())
+    return os.path.getsize(path), time.perf_counter() - start
 
-    imwrite("captured_image.png", image)  # Save the captured image
 
-    waitKey(0)  # Wait for a key press to close the window
-    destroyWindow("CapturedImage")
+def burst_capture(cam, args):
+    """Grab frames at full device rate while a worker pool encodes them.
 
-else:
-    print("Failed to capture image")
\ No newline at end of file
+    At most ``args.max_pending`` frames are queued or being encoded at once,
+    which bounds the memory a burst takes. At that limit capture waits for
+    a frame to finish, or with ``args.drop`` discards the new frame.
+    """
+    os.makedirs(args.output_dir, exist_ok=True)
+    extension = "jpg" if args.format == "jpeg" else args.format
+    pool = ThreadPoolExecutor(max_workers=args.workers)
+    futures = []
+    pending = [0]
+    max_pending = 0
+    dropped = 0
+    lock = threading.Lock()
+    slots = threading.Semaphore(args.max_pending)
+
+    def encoded(_):
+        slots.release()
+        with lock:
+            pending[0] -= 1
+
+    # Capture only waits on compression once max_pending frames are queued or being encoded
+    start = time.perf_counter()
+    while True:
+        if args.frames and len(futures) >= args.frames:
+            break
+        if args.duration and time.perf_counter() - start >= args.duration:
+            break
+        result, image = cam.read()
+        if not result:
+            print("Failed to capture image, stopping burst")
+            break
+        if not slots.acquire(blocking=not args.drop):
+            dropped += 1
+            continue
+        path = os.path.join(args.output_dir, f"frame_{len(futures):06d}.{extension}")
+        with lock:
+            pending[0] += 1
+            max_pending = max(max_pending, pending[0])
+        future = pool.submit(encode_frame, image, path, extension, args.png_level, args.jpeg_quality)
+        future.add_done_callback(encoded)
+        futures.append(future)
+    capture_time = time.perf_counter() - start
+
+    pool.shutdown(wait=True)
+    total_time = time.perf_counter() - start
+    sizes, encode_times = zip(*(future.result() for future in futures)) if futures else ((), ())
+
+    count = len(futures)
+    captured = count + dropped
+    print(f"Captured {captured} frame(s) in {capture_time:.2f} s: "
+          f"{captured / capture_time if capture_time else 0:.1f} fps")
+    if dropped:
+        print(f"Dropped {dropped} frame(s) while {args.max_pending} frame(s) were queued or being encoded")
+    if count:
+        megabytes = sum(sizes) / 2**20
+        print(f"Encoded {count} {args.format} file(s), {megabytes:.1f} MB, with {args.workers} worker(s) "
+              f"in {total_time:.2f} s: {count / total_time:.1f} frames/s, {megabytes / total_time:.1f} MB/s")
+        print(f"Encode time per frame: {1000 * sum(encode_times) / count:.1f} ms average, "
+              f"{1000 * max(encode_times):.1f} ms max; up to {max_pending} frame(s) queued or being encoded")
+        print(f"Files written to {args.output_dir}")
+
+
+def capture_single(cam):
+    """Grab one frame, show it and save it as PNG."""
+    result, image = cam.read()
+
+    if result:
+
+        imshow("CapturedImage", image)
+
+        imwrite("captured_image.png", image)  # Save the captured image
+
+        waitKey(0)  # Wait for a key press to close the window
+        destroyWindow("CapturedImage")
+
+    else:
+        print("Failed to capture image")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Capture a single image, or a burst of images")
+    parser.add_argument("--port", type=int, default=0, help="camera index (default: 0)")
+    parser.add_argument("--source", help="frame source spec instead of a camera, see frame_sources.open_source")
+    parser.add_argument("--burst", dest="frames", type=int, help="burst mode: capture this many frames")
+    parser.add_argument("--duration", type=float, help="burst mode: capture for this many seconds")
+    parser.add_argument("--format", choices=("png", "jpeg", "npy"), default="png",
+                        help="burst image format (default: png)")
+    parser.add_argument("--png-level", type=int, default=3, choices=range(10), metavar="0-9",
+                        help="PNG compression level, lower is faster (default: 3)")
+    parser.add_argument("--jpeg-quality", type=int, default=95, help="JPEG quality 0-100 (default: 95)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="encoder threads (default: one per CPU)")
+    parser.add_argument("--max-pending", type=int, default=32,
+                        help="frames that may be queued or being encoded at once, bounds the memory used (default: 32)")
+    parser.add_argument("--drop", action="store_true",
+                        help="drop frames while --max-pending frames are queued or being encoded, instead of slowing down capture")
+    parser.add_argument("--output-dir", default="burst", help="burst output directory (default: burst)")
+    args = parser.parse_args()
+
+    cam_port = args.port  # Change this to the correct port if needed
+    cam = open_source(args.source, speed=0) if args.source else VideoCapture(cam_port)
+
+    if args.frames or args.duration:
+        burst_capture(cam, args)
+    else:
+        capture_single(cam)
+    cam.release()
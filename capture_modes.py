@@ -0,0 +1,161 @@
+from collections import namedtuple
+import time
+
+from lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
+
+CaptureMode = namedtuple("CaptureMode", "fourcc width height fps")
+
+# Candidate modes, tried from best to worst. YUYV and YUY2 are the same
+# uncompressed format, V4L2 and DirectShow just name it differently.
+FOURCCS = ("MJPG", "YUYV", "YUY2")
+RESOLUTIONS = ((3840, 2160), (2560, 1440), (1920, 1080), (1600, 1200), (1280, 720), (1024, 768),
+               (800, 600), (640, 480))
+FRAME_RATES = (60, 30)
+
+COMPRESSED_FOURCCS = {"MJPG"}
+DECODE_COST = 3.0            # Relative CPU cost per pixel of decoding a compressed stream
+VERIFY_FRAMES = 15           # Frames read to measure the real frame rate of a candidate
+MIN_MEASURED_FPS_RATIO = 0.8  # Measured fps below this share of the promised fps rejects a mode
+VERIFIED_CANDIDATES = 3
+
+OBJECTIVES = ("max_fps", "min_cpu", "max_resolution")
+
+
+def fourcc_to_str(value):
+    value = int(value)
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4)).strip("\0 ") if value else ""
+
+
+def read_mode(cap):
+    """Read the active mode of an opened capture."""
+    return CaptureMode(fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC)),
+                       int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                       int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                       cap.get(cv2.CAP_PROP_FPS))
+
+
+def apply_mode(cap, mode):
+    """Request a mode and return the mode the device actually switched to."""
+    if mode.fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*mode.fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, mode.width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, mode.height)
+    if mode.fps:
+        cap.set(cv2.CAP_PROP_FPS, mode.fps)
+    return read_mode(cap)
+
+
+def accepted(requested, actual):
+    """True if the device switched to the requested format and size.
+
+    Backends that do not report a FOURCC are trusted on the format.
+    """
+    return ((actual.width, actual.height) == (requested.width, requested.height)
+            and actual.fourcc in ("", requested.fourcc))
+
+
+def list_modes(cap, fourccs=FOURCCS, resolutions=RESOLUTIONS, frame_rates=FRAME_RATES):
+    """Try the candidate modes and return the distinct ones the device accepts.
+
+    Drivers snap unsupported requests to a nearby mode, so every request is
+    read back and only exact matches are kept, with the reported frame rate.
+    """
+    modes = []
+    for fourcc in fourccs:
+        for width, height in resolutions:
+            for fps in frame_rates:
+                requested = CaptureMode(fourcc, width, height, fps)
+                actual = apply_mode(cap, requested)
+                if not accepted(requested, actual):
+                    continue
+                mode = requested._replace(fps=actual.fps or fps)
+                if mode not in modes:
+                    modes.append(mode)
+    return modes
+
+
+def parse_target(target):
+    """Parse "<objective>[:<min height>]", e.g. "max_fps:720" or "min_cpu"."""
+    objective, _, min_height = target.partition(":")
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown capture target {target!r}, expected one of {', '.join(OBJECTIVES)}")
+    return objective, int(min_height or 0)
+
+
+def mode_cost(mode):
+    """Relative CPU cost of receiving a mode."""
+    cost = mode.width * mode.height * mode.fps
+    return cost * DECODE_COST if mode.fourcc in COMPRESSED_FOURCCS else cost
+
+
+def rank_modes(modes, target):
+    """Order the modes meeting the target from best to worst."""
+    objective, min_height = parse_target(target)
+    eligible = [mode for mode in modes if mode.height >= min_height] or list(modes)
+
+    if objective == "max_fps":
+        key = lambda mode: (-mode.fps, -mode.width * mode.height, mode_cost(mode))
+    elif objective == "min_cpu":
+        key = lambda mode: (mode_cost(mode), -mode.fps)
+    else:
+        key = lambda mode: (-mode.width * mode.height, -mode.fps, mode_cost(mode))
+    return sorted(eligible, key=key)
+
+
+def measure_fps(cap, frames=VERIFY_FRAMES, clock=time.monotonic):
+    """Read frames and return the rate the device really delivers."""
+    # The first frames after a mode switch often arrive late
+    for _ in range(2):
+        cap.read()
+    start = clock()
+    for _ in range(frames):
+        ret, _ = cap.read()
+        if not ret:
+            return 0.0
+    elapsed = clock() - start
+    return frames / elapsed if elapsed > 0 else 0.0
+
+
+def negotiate(cap, target, verify_frames=VERIFY_FRAMES, clock=time.monotonic):
+    """Find and apply the best mode for ``target``.
+
+    The best ranked candidates are switched to and their frame rate is
+    measured, as drivers often promise more than they deliver. Returns the
+    chosen mode, with the measured frame rate, and all accepted modes.
+    ``cap`` only needs the get, set and read methods of cv2.VideoCapture,
+    so the negotiation can be driven by a scripted fake capture.
+    """
+    modes = list_modes(cap)
+    ranked = rank_modes(modes, target)
+
+    best = None
+    for mode in ranked[:VERIFIED_CANDIDATES]:
+        actual = apply_mode(cap, mode)
+        if not accepted(mode, actual):
+            continue
+        measured = measure_fps(cap, verify_frames, clock)
+        candidate = mode._replace(fps=round(measured, 1))
+        if measured >= MIN_MEASURED_FPS_RATIO * mode.fps:
+            return candidate, modes
+        if best is None or candidate.fps > best.fps:
+            best = candidate
+
+    # Nothing delivered what it promised, settle for the fastest one measured
+    if best is not None:
+        apply_mode(cap, best)
+        return best, modes
+    return read_mode(cap), modes
+
+
+def prepare_mode(cap, target, cached=None):
+    """Switch to the cached mode for ``target``, negotiating if that fails.
+
+    Returns (mode, modes); modes is None when the cached mode was used.
+    """
+    if cached is not None:
+        actual = apply_mode(cap, cached)
+        if accepted(cached, actual):
+            return cached, None
+    return negotiate(cap, target)
@@ -1,7 +1,10 @@
-import numpy as np
+import sys
 import cv2 as cv
 
-cap = cv.VideoCapture(0, cv.CAP_DSHOW)
+from frame_sources import open_source
+
+# Camera 0 by default, or any frame source spec, e.g. file:recording.mp4
+cap = open_source(sys.argv[1] if len(sys.argv) > 1 else "device:0")
 if not cap.isOpened():
     print("Cannot open camera")
     exit()
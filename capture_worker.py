@@ -0,0 +1,133 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+
+import threading
+import time
+
+from capture_modes import read_mode
+from frame_scheduler import FrameScheduler
+
+
+class CaptureWorker(QThread):
+    """Read frames from an opened capture device on a dedicated thread.
+
+    The worker reads as fast as the device delivers and hands frames over
+    through a FrameScheduler, by default keeping only the newest frame. The
+    GUI is notified through ``frame_ready`` and pulls the frame with
+    ``latest_frame()``; while a notification is still pending no further
+    signals are queued, so a slow UI never builds up a backlog. Other
+    threads can block on ``wait_frame()`` instead.
+
+    An optional ``prepare`` callable is run with the capture on the worker
+    thread before the first read, e.g. to negotiate the capture mode. The
+    active CaptureMode is then read, also on this thread as drivers may
+    block on it, and reported with the result of ``prepare`` through
+    ``capture_prepared`` as (mode, result).
+
+    Raw frames are also handed to ``recorder`` and ``pre_trigger`` when set.
+    When ``properties`` is a CameraProperties model, its queued writes and
+    polls run on this thread between frames and changed values are reported
+    through ``properties_changed``.
+
+    A recorded source that runs out of frames is reported through
+    ``capture_ended`` instead of ``capture_failed``.
+    """
+
+    frame_ready = pyqtSignal()
+    capture_prepared = pyqtSignal(object)
+    capture_failed = pyqtSignal(str)
+    capture_ended = pyqtSignal()
+    properties_changed = pyqtSignal(object)
+
+    def __init__(self, cap, telemetry=None, prepare=None, scheduler=None, parent=None):
+        super().__init__(parent)
+        self.cap = cap
+        self.telemetry = telemetry
+        self.prepare = prepare
+        self.scheduler = scheduler or FrameScheduler()
+        self.recorder = None
+        self.pre_trigger = None
+        self.properties = None
+        self.frames_captured = 0
+        self._running = False
+        self._lock = threading.Lock()
+        self._pending = False
+
+    def start(self, priority=QThread.Priority.InheritPriority):
+        # Set before the thread runs, so a stop() right after start() is never undone
+        self._running = True
+        super().start(priority)
+
+    def run(self):
+        """Capture loop, runs until stop() is called or the device fails."""
+        try:
+            result = self.prepare(self.cap) if self.prepare else None
+            self.capture_prepared.emit((read_mode(self.cap), result))
+        except Exception as error:
+            self.capture_failed.emit(f"Error preparing camera: {error!r}")
+            return
+
+        while self._running:
+            try:
+                ret, frame = self.cap.read()
+            except Exception as error:
+                self.capture_failed.emit(f"Error reading from camera: {error!r}")
+                break
+            if not self._running:
+                break
+            if not ret:
+                if getattr(self.cap, "ended", False):
+                    self.capture_ended.emit()
+                else:
+                    self.capture_failed.emit("Error reading from camera")
+                break
+
+            if self.telemetry:
+                self.telemetry.record_capture()
+
+            timestamp = time.time()
+            recorder = self.recorder
+            if recorder:
+                recorder.write(frame, timestamp)
+
+            self.frames_captured += 1
+            seq = self.frames_captured
+            skipped = self.scheduler.put(seq, timestamp, frame)
+            if skipped and self.telemetry:
+                self.telemetry.record_skipped(skipped)
+
+            with self._lock:
+                notify = not self._pending
+                self._pending = True
+            if notify:
+                self.frame_ready.emit()
+
+            pre_trigger = self.pre_trigger
+            if pre_trigger:
+                pre_trigger.feed(frame, seq, timestamp)
+
+            properties = self.properties
+            if properties:
+                properties.service(self.cap)
+
+    def latest_frame(self):
+        """Return the next scheduled (sequence, timestamp, frame) and mark it consumed.
+
+        Returns None if no frame is waiting.
+        """
+        with self._lock:
+            self._pending = False
+        return self.scheduler.take()
+
+    def wait_frame(self, timeout):
+        """Wait up to ``timeout`` seconds for a new frame, see latest_frame()."""
+        latest = self.scheduler.get(timeout)
+        with self._lock:
+            self._pending = False
+        return latest
+
+    def stop(self):
+        """Stop the capture loop and wait for the thread to finish."""
+        self._running = False
+        # A capture thread waiting for room in the scheduler queue has to wake up
+        self.scheduler.close()
+        self.wait()
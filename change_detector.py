@@ -0,0 +1,53 @@
+from lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+THUMBNAIL_WIDTH = 64    # Width of the thumbnail frames are compared at, the height keeps the aspect ratio
+CHANGE_THRESHOLD = 8    # Gray levels a thumbnail pixel has to differ by to count as changed
+CHANGE_AREA = 0.002     # Fraction of thumbnail pixels that has to change, 0 means any pixel
+
+
+def thumbnail(frame, width=THUMBNAIL_WIDTH):
+    """A small gray copy of ``frame``, averaged over blocks so sensor noise cancels out."""
+    height = max(1, round(frame.shape[0] * width / frame.shape[1]))
+    small = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return small.astype(np.int16)
+
+
+class ChangeDetector:
+    """Tell whether a frame differs noticeably from the last changed one.
+
+    Frames are compared as thumbnails of ``width`` pixels. A frame counts
+    as changed when more than ``area`` of the thumbnail pixels differ by
+    more than ``threshold`` gray levels. The reference is the last frame
+    that counted as changed, not simply the previous one, so a slow drift
+    is noticed once it adds up.
+    """
+
+    def __init__(self, threshold=CHANGE_THRESHOLD, area=CHANGE_AREA, width=THUMBNAIL_WIDTH):
+        self.threshold = threshold
+        self.area = area
+        self.width = width
+        self.changed_frames = 0
+        self.unchanged_frames = 0
+        self._reference = None
+
+    def check(self, frame):
+        """True if ``frame`` changed, it then becomes the new reference."""
+        small = thumbnail(frame, self.width)
+        reference = self._reference
+        if reference is not None and reference.shape == small.shape:
+            changed = np.count_nonzero(np.abs(small - reference) > self.threshold)
+            if changed <= self.area * small.size:
+                self.unchanged_frames += 1
+                return False
+        self._reference = small
+        self.changed_frames += 1
+        return True
+
+    def reset(self):
+        """Forget the reference, the next frame counts as changed."""
+        self._reference = None
@@ -0,0 +1,122 @@
+import json
+import os
+
+from camera_discovery import CameraDevice
+from capture_modes import CaptureMode
+
+INVENTORY_PATH = os.path.join(os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache"),
+                              "camera-python", "inventory.json")
+INVENTORY_VERSION = 1
+SOURCE_PREFIX = "source:"  # Device ID prefix of frame sources given on the command line
+
+
+def is_device(camera):
+    """True for a capture device, frame sources have no index and are never cached."""
+    return camera.index is not None and not camera.device_id.startswith(SOURCE_PREFIX)
+
+
+class DeviceInventory:
+    """On-disk cache of discovered cameras keyed by stable device identity.
+
+    Each entry stores the last OpenCV index and name seen for the device,
+    the last capture mode that worked for it and the modes negotiated per
+    capture target, so the application can show the camera list immediately
+    and reopen a device in a known good mode.
+    """
+
+    def __init__(self, path=INVENTORY_PATH):
+        self.path = path
+        self.devices = {}
+        self.error = None
+        self.load()
+
+    def load(self):
+        """Read the cache, an unreadable or outdated file is treated as empty."""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INVENTORY_VERSION:
+            self.devices = data.get("devices", {})
+
+    def save(self):
+        """Write the cache atomically so a crash never leaves half a file.
+
+        Returns False if it cannot be written, e.g. on a read-only or full
+        disk; the error is kept in ``error`` and the devices stay in memory.
+        """
+        tmp_path = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump({"version": INVENTORY_VERSION, "devices": self.devices}, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as error:
+            self.error = error
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+        self.error = None
+        return True
+
+    def cameras(self):
+        """Return the cached cameras as CameraDevice tuples ordered by index.
+
+        Entries without a valid index, e.g. frame sources stored by an
+        older version, are left out.
+        """
+        cameras = [CameraDevice(entry.get("index"), entry.get("name", device_id), device_id)
+                   for device_id, entry in self.devices.items()]
+        return sorted((camera for camera in cameras if isinstance(camera.index, int) and is_device(camera)),
+                      key=lambda camera: camera.index)
+
+    def update(self, cameras):
+        """Replace the cached camera list with a fresh discovery result.
+
+        Capture modes of devices that are still present are kept, frame
+        sources are skipped. Returns the identities of the (added, changed,
+        removed) devices.
+        """
+        previous = self.devices
+        self.devices = {}
+        added, changed = [], []
+
+        for camera in filter(is_device, cameras):
+            entry = previous.get(camera.device_id)
+            if entry is None:
+                added.append(camera.device_id)
+                entry = {}
+            elif (entry.get("index"), entry.get("name")) != (camera.index, camera.name):
+                changed.append(camera.device_id)
+            self.devices[camera.device_id] = dict(entry, index=camera.index, name=camera.name)
+
+        removed = [device_id for device_id in previous if device_id not in self.devices]
+        return added, changed, removed
+
+    def capture_mode(self, device_id):
+        """Return the last working CaptureMode of a device, or None."""
+        mode = self.devices.get(device_id, {}).get("mode")
+        return CaptureMode(**mode) if mode else None
+
+    def set_capture_mode(self, device_id, mode):
+        """Remember a working CaptureMode for a known device."""
+        if device_id in self.devices:
+            self.devices[device_id]["mode"] = mode._asdict()
+
+    def negotiated_mode(self, device_id, target):
+        """Return the CaptureMode negotiated for a capture target, or None."""
+        mode = self.devices.get(device_id, {}).get("negotiated", {}).get(target)
+        return CaptureMode(**mode) if mode else None
+
+    def set_negotiated_mode(self, device_id, target, mode, modes=None):
+        """Remember the negotiation result of a known device, and its accepted modes."""
+        if device_id not in self.devices:
+            return
+        entry = self.devices[device_id]
+        entry.setdefault("negotiated", {})[target] = mode._asdict()
+        if modes is not None:
+            entry["modes"] = [m._asdict() for m in modes]
+
@@ -0,0 +1,91 @@
+from collections import deque, namedtuple
+from datetime import datetime
+import json
+import logging
+import logging.handlers
+import threading
+import time
+
+EVENT_CAPACITY = 2000         # Events kept in memory and shown in the log view
+LOG_MAX_BYTES = 10 * 2**20    # Size at which the event log file is rotated
+LOG_BACKUPS = 5               # Rotated event log files kept next to the current one
+
+LEVELS = ("debug", "info", "warning", "error")
+
+Event = namedtuple("Event", "time level kind message fields")
+
+
+class JsonFormatter(logging.Formatter):
+    """Format an Event passed as the log message as one JSON line."""
+
+    def format(self, record):
+        event = record.msg
+        return json.dumps(dict(time=datetime.fromtimestamp(event.time).isoformat(timespec="milliseconds"),
+                               level=event.level, kind=event.kind, message=event.message, **event.fields),
+                          default=str)
+
+
+class EventLog:
+    """A bounded log of typed events, mirrored to a rotating JSON lines file.
+
+    add() records an Event with a level, a kind such as "camera" or
+    "recording" and optional fields. The newest ``capacity`` events are
+    kept in ``events``, older ones are dropped, so memory use stays flat
+    however long the viewer runs. The GUI collects new events in batches
+    with take_new(); events added faster than it collects are only counted
+    in ``dropped``.
+
+    With a ``path`` every event is also written to that file, which is
+    rotated at ``max_bytes`` keeping ``backups`` older files.
+    """
+
+    def __init__(self, capacity=EVENT_CAPACITY, path=None, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+        self.capacity = capacity
+        self.path = path
+        self.events = deque(maxlen=capacity)
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._new = deque(maxlen=capacity)
+        self._logger = None
+        if path:
+            handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                           encoding="utf-8")
+            handler.setFormatter(JsonFormatter())
+            # A logger of its own, so the events never reach the root logger
+            self._logger = logging.Logger(f"event_log.{id(self)}")
+            self._logger.addHandler(handler)
+
+    def add(self, message, level="info", kind="app", **fields):
+        """Record an event and return it."""
+        if level not in LEVELS:
+            raise ValueError(f"Unknown event level {level!r}, expected one of {', '.join(LEVELS)}")
+        event = Event(time.time(), level, kind, message, fields)
+        with self._lock:
+            self.events.append(event)
+            if len(self._new) == self._new.maxlen:
+                self.dropped += 1
+            self._new.append(event)
+        if self._logger:
+            self._logger.info(event)
+        return event
+
+    def take_new(self):
+        """Return the events added since the last call, oldest first."""
+        with self._lock:
+            new = list(self._new)
+            self._new.clear()
+        return new
+
+    def close(self):
+        if self._logger:
+            for handler in list(self._logger.handlers):
+                self._logger.removeHandler(handler)
+                handler.close()
+            self._logger = None
+
+
+def format_event(event):
+    """One line of the log view."""
+    timestamp = datetime.fromtimestamp(event.time).strftime("%H:%M:%S")
+    level = "" if event.level == "info" else f"{event.level.upper()}: "
+    return f"[{timestamp}] {level}{event.message}"
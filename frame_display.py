@@ -0,0 +1,105 @@
+from PyQt6.QtGui import QImage
+
+import math
+import time
+
+from lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+
+def fit_rect(frame_size, cell):
+    """Rectangle a (width, height) frame fills when fitted and centered in ``cell``.
+
+    Both ``cell`` and the result are (x, y, width, height).
+    """
+    x, y, cell_w, cell_h = cell
+    scale = min(cell_w / frame_size[0], cell_h / frame_size[1])
+    out_w, out_h = max(1, int(frame_size[0] * scale)), max(1, int(frame_size[1] * scale))
+    return x + (cell_w - out_w) // 2, y + (cell_h - out_h) // 2, out_w, out_h
+
+
+class FrameConverter:
+    """Convert BGR or grayscale frames into display-sized QImages.
+
+    The frame is downscaled to the target size before anything else, into a
+    buffer that is reused while the display size stays the same. BGR frames
+    are wrapped with the BGR-native QImage format, so no channel swap or
+    full-resolution copy is ever made.
+
+    The returned QImage shares memory with the internal buffer and is only
+    valid until this converter is called again. An image that is kept, e.g.
+    cached for repaints, needs a converter of its own; VideoWidget uses one
+    per grid position.
+    """
+
+    def __init__(self):
+        self._buffer = None
+        self.last_ms = 0.0
+        self.total_ms = 0.0
+        self.conversions = 0
+
+    @property
+    def average_ms(self):
+        """Average conversion time per frame in milliseconds."""
+        return self.total_ms / self.conversions if self.conversions else 0.0
+
+    def to_qimage(self, frame, size, smooth=True):
+        """Scale a frame to fit (width, height) keeping its aspect ratio.
+
+        Without ``smooth`` the nearest pixel is taken, which is faster but
+        shows aliasing when shrinking.
+        """
+        start = time.perf_counter()
+
+        h, w = frame.shape[:2]
+        scale = min(size[0] / w, size[1] / h)
+        out_w, out_h = max(1, int(w * scale)), max(1, int(h * scale))
+
+        if (out_w, out_h) == (w, h) and frame.flags["C_CONTIGUOUS"]:
+            image_data = frame
+        else:
+            shape = (out_h, out_w) + frame.shape[2:]
+            if self._buffer is None or self._buffer.shape != shape:
+                self._buffer = np.empty(shape, dtype=np.uint8)
+            # INTER_AREA gives the best quality when shrinking and is cheap
+            if not smooth:
+                interpolation = cv2.INTER_NEAREST
+            else:
+                interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+            cv2.resize(frame, (out_w, out_h), dst=self._buffer, interpolation=interpolation)
+            image_data = self._buffer
+
+        if image_data.ndim == 2:
+            image_format = QImage.Format.Format_Grayscale8
+        else:
+            image_format = QImage.Format.Format_BGR888
+        qt_image = QImage(image_data.data, out_w, out_h, image_data.strides[0], image_format)
+
+        self.last_ms = (time.perf_counter() - start) * 1000
+        self.total_ms += self.last_ms
+        self.conversions += 1
+        return qt_image
+
+
+class GridCompositor:
+    """Layout of the frames of several cameras in one display.
+
+    Cells are as close to square a grid as the count allows; VideoWidget
+    fits each frame into its cell keeping its aspect ratio.
+    """
+
+    @staticmethod
+    def grid(count):
+        """(columns, rows) of the grid for ``count`` cells."""
+        columns = max(1, math.ceil(math.sqrt(count)))
+        return columns, max(1, math.ceil(count / columns))
+
+    @classmethod
+    def cells(cls, count, size):
+        """The (x, y, width, height) cell of every position in a (width, height) grid."""
+        columns, rows = cls.grid(count)
+        cell_w, cell_h = size[0] // columns, size[1] // rows
+        return [((position % columns) * cell_w, (position // columns) * cell_h, cell_w, cell_h)
+                for position in range(count)]
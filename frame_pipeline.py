@@ -0,0 +1,452 @@
+import json
+import time
+
+from lazy_import import lazy_import
+from tiled_processing import TileProcessor
+
+cv2 = lazy_import("cv2")
+
+SOURCE = "source"  # View name of the unprocessed camera frame
+MAX_PYRAMID_LEVEL = 3  # Each level halves the width and height of the processed frame
+
+# Color conversions that can be undone exactly, (from, to) color spaces
+LOSSLESS_CONVERSIONS = {("GRAY", "BGR"), ("GRAY", "RGB"), ("BGR", "RGB"), ("RGB", "BGR")}
+
+
+class Stage:
+    """A single frame processing step of a Pipeline."""
+
+    type_name = None
+
+    def __init__(self, name=None):
+        self.name = name or self.type_name
+
+    def apply(self, image):
+        """Process an image and return the result."""
+        raise NotImplementedError
+
+    def is_noop(self):
+        """True if the stage leaves every image unchanged."""
+        return False
+
+    def halo(self):
+        """Pixels around a pixel its output depends on, None if it depends on the whole image."""
+        return None
+
+    def fuse(self, following):
+        """Return the stages replacing this stage followed by ``following``.
+
+        None means the two stages cannot be fused; an empty list means
+        together they have no effect. A fusion must give the same output
+        as the two stages, pixel for pixel.
+        """
+        return None
+
+    def params(self):
+        """Return the stage parameters as a dict."""
+        return {}
+
+    def to_dict(self):
+        return dict(type=self.type_name, name=self.name, **self.params())
+
+    def __repr__(self):
+        params = ", ".join(f"{key}={value!r}" for key, value in self.params().items())
+        return f"{type(self).__name__}({params}, name={self.name!r})"
+
+
+class ColorConvert(Stage):
+    """Convert between color spaces, ``code`` as in cv2.COLOR_<code>."""
+
+    type_name = "color_convert"
+
+    def __init__(self, code="BGR2GRAY", name=None):
+        super().__init__(name)
+        self.code = code
+        self.source_space, _, self.target_space = code.partition("2")
+        if not self.source_space or not self.target_space:
+            raise ValueError(f"Invalid color conversion: {code}")
+        # Looked up on first use, OpenCV is imported lazily
+        self._cv_code = None
+
+    def apply(self, image):
+        # Single channel input is already gray
+        if image.ndim == 2 and self.target_space == "GRAY":
+            return image
+        if self._cv_code is None:
+            self._cv_code = getattr(cv2, f"COLOR_{self.code}")
+        return cv2.cvtColor(image, self._cv_code)
+
+    def is_noop(self):
+        return self.source_space == self.target_space
+
+    def halo(self):
+        return 0
+
+    def fuse(self, following):
+        if not isinstance(following, ColorConvert):
+            return None
+        if (self.source_space, self.target_space) not in LOSSLESS_CONVERSIONS:
+            return None
+        if following.target_space == self.source_space:
+            return []
+        direct_code = f"{self.source_space}2{following.target_space}"
+        if hasattr(cv2, f"COLOR_{direct_code}"):
+            return [ColorConvert(direct_code, name=following.name)]
+        return None
+
+    def params(self):
+        return {"code": self.code}
+
+
+class GaussianBlur(Stage):
+    """Gaussian blur with an odd kernel size, sigma 0 derives it from the kernel."""
+
+    type_name = "gaussian_blur"
+
+    def __init__(self, ksize=5, sigma=0, name=None):
+        super().__init__(name)
+        self.ksize = int(ksize)
+        self.sigma = float(sigma)
+
+    def apply(self, image):
+        return cv2.GaussianBlur(image, (self.ksize, self.ksize), self.sigma)
+
+    def is_noop(self):
+        return self.ksize <= 1
+
+    def halo(self):
+        return self.ksize // 2
+
+    def params(self):
+        return {"ksize": self.ksize, "sigma": self.sigma}
+
+
+class Canny(Stage):
+    """Canny edge detection, the output only contains 0 and 255."""
+
+    type_name = "canny"
+
+    def __init__(self, low=70, high=130, aperture=3, name=None):
+        super().__init__(name)
+        self.low = low
+        self.high = high
+        self.aperture = int(aperture)
+
+    def apply(self, image):
+        return cv2.Canny(image, self.low, self.high, apertureSize=self.aperture)
+
+    def halo(self):
+        # Sobel plus non-maximum suppression; hysteresis follows edges further, see TileProcessor
+        return self.aperture // 2 + 1
+
+    def fuse(self, following):
+        # Binary thresholding an edge map gives the same edge map
+        if isinstance(following, Threshold) and following.is_identity_on_binary():
+            return [Canny(self.low, self.high, self.aperture, name=following.name)]
+        return None
+
+    def params(self):
+        return {"low": self.low, "high": self.high, "aperture": self.aperture}
+
+
+class Threshold(Stage):
+    """Fixed or Otsu threshold, ``method`` is binary, binary_inv or otsu."""
+
+    type_name = "threshold"
+
+    # cv2 flags combined for each method
+    METHODS = {
+        "binary": ("THRESH_BINARY",),
+        "binary_inv": ("THRESH_BINARY_INV",),
+        "otsu": ("THRESH_BINARY", "THRESH_OTSU"),
+    }
+
+    def __init__(self, value=127, maxval=255, method="binary", name=None):
+        super().__init__(name)
+        self.value = value
+        self.maxval = maxval
+        self.method = method
+        self._flags = self.METHODS[method]
+
+    def apply(self, image):
+        if self.method == "otsu" and image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        cv_type = 0
+        for flag in self._flags:
+            cv_type |= getattr(cv2, flag)
+        _, result = cv2.threshold(image, self.value, self.maxval, cv_type)
+        return result
+
+    def halo(self):
+        # Otsu picks the threshold from the histogram of the whole image
+        return None if self.method == "otsu" else 0
+
+    def is_identity_on_binary(self):
+        """True if a 0/255 image passes through unchanged."""
+        return self.method == "binary" and self.value < 255 and self.maxval == 255
+
+    def params(self):
+        return {"value": self.value, "maxval": self.maxval, "method": self.method}
+
+
+STAGE_TYPES = {stage.type_name: stage for stage in (ColorConvert, GaussianBlur, Canny, Threshold)}
+
+
+def compile_stages(stages):
+    """Drop no-op stages and fuse neighbouring stages where possible."""
+    plan = []
+    for stage in stages:
+        if stage.is_noop():
+            continue
+        plan.append(stage)
+        while len(plan) >= 2:
+            fused = plan[-2].fuse(plan[-1])
+            if fused is None:
+                break
+            del plan[-2:]
+            plan.extend(fused)
+    return plan
+
+
+class Pipeline:
+    """Ordered list of processing stages with a selectable displayed output.
+
+    ``display`` names the stage whose output is shown, or SOURCE for the
+    unprocessed frame. Only the stages up to the displayed one are run, so
+    switching views at runtime also decides how much work is done.
+
+    Before the stages run, the frame is cropped to the region of interest
+    ``roi``, (x, y, width, height) in frame pixels, and reduced ``level``
+    times with cv2.pyrDown.
+
+    With ``tiles`` set to a tile size, the stages only run on the tiles
+    that changed since the previous frame, see TileProcessor. Plans with
+    a stage that depends on the whole image always run on all of it.
+
+    The stage outputs of the last frame are kept. Processing the same frame
+    object again, e.g. a paused frame after a parameter change, reruns only
+    the stages from the first one whose parameters changed.
+    """
+
+    def __init__(self, stages, display=None, roi=None, level=0, tiles=None):
+        self.stages = list(stages)
+        names = [stage.name for stage in self.stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Stage names must be unique: {names}")
+        self.display = None
+        self.roi = None
+        self.level = 0
+        self.tiles = None
+        self.tiler = None
+        self._plan = None
+        self._cache_frame = None
+        self._cache = None
+        self.set_display(display or (names[-1] if names else SOURCE))
+        self.set_roi(roi)
+        self.set_level(level)
+        self.set_tiles(tiles)
+
+    @classmethod
+    def from_dict(cls, config):
+        """Build a pipeline from {"stages": [{"type": ..., ...}], "display": ...}."""
+        stages = []
+        for stage_config in config.get("stages", []):
+            params = dict(stage_config)
+            stage_type = params.pop("type")
+            if stage_type not in STAGE_TYPES:
+                raise ValueError(f"Unknown stage type: {stage_type}")
+            stages.append(STAGE_TYPES[stage_type](**params))
+        return cls(stages, config.get("display"), config.get("roi"), config.get("level", 0), config.get("tiles"))
+
+    @classmethod
+    def from_config(cls, path):
+        """Load a pipeline from a JSON config file."""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self):
+        return {"stages": [stage.to_dict() for stage in self.stages], "display": self.display,
+                "roi": list(self.roi) if self.roi else None, "level": self.level, "tiles": self.tiles}
+
+    def views(self):
+        """Names that can be displayed, in processing order."""
+        return [SOURCE] + [stage.name for stage in self.stages]
+
+    def set_display(self, name):
+        """Select the displayed output, this recompiles the execution plan."""
+        if name not in self.views():
+            raise ValueError(f"Unknown view: {name}")
+        self.display = name
+        self._plan = None
+
+    def stage(self, name):
+        """The stage called ``name``."""
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(f"No stage named {name!r}")
+
+    def set_params(self, name, **params):
+        """Change parameters of a stage, the plan is recompiled for the next frame."""
+        stage = self.stage(name)
+        unknown = set(params) - set(stage.params())
+        if unknown:
+            raise ValueError(f"Unknown parameters for {name}: {', '.join(sorted(unknown))}")
+        # Stages are rebuilt rather than modified, a frame being processed keeps its plan
+        replacement = type(stage)(name=stage.name, **{**stage.params(), **params})
+        self.stages = [replacement if other is stage else other for other in self.stages]
+        self._plan = None
+
+    def set_roi(self, roi):
+        """Process only the (x, y, width, height) rectangle, None for the whole frame."""
+        if roi is not None:
+            x, y, width, height = (int(value) for value in roi)
+            if x < 0 or y < 0 or width <= 0 or height <= 0:
+                raise ValueError(f"Invalid region of interest: {roi}")
+            roi = (x, y, width, height)
+        self.roi = roi
+
+    def set_level(self, level):
+        """Process at pyramid ``level``, 0 is full resolution."""
+        if not 0 <= level <= MAX_PYRAMID_LEVEL:
+            raise ValueError(f"Pyramid level must be between 0 and {MAX_PYRAMID_LEVEL}")
+        self.level = level
+
+    def set_tiles(self, tile_size):
+        """Only reprocess changed tiles of ``tile_size`` pixels, None processes whole frames."""
+        if tile_size is not None:
+            tile_size = int(tile_size)
+            if tile_size < 8:
+                raise ValueError("Tiles must be at least 8 pixels")
+        if tile_size != self.tiles:
+            self.tiles = tile_size
+            self.tiler = TileProcessor(tile_size) if tile_size else None
+
+    def reduce(self, frame):
+        """Crop a frame to the region of interest and downsample it to the pyramid level."""
+        roi = self.roi
+        if roi is not None:
+            x, y, width, height = roi
+            # A view, nothing is copied; clipped to the frame
+            cropped = frame[y:y + height, x:x + width]
+            if cropped.size:
+                frame = cropped
+        for _ in range(self.level):
+            frame = cv2.pyrDown(frame)
+        return frame
+
+    def plan(self):
+        """The fused stages needed for the displayed output."""
+        # The GUI thread resets _plan at any time, so it is read only once
+        plan = self._plan
+        if plan is None:
+            needed = self.views().index(self.display)
+            plan = self._plan = compile_stages(self.stages[:needed])
+        return plan
+
+    def halo(self):
+        """How far the plan looks around a pixel, None if it depends on the whole image."""
+        halos = [stage.halo() for stage in self.plan()]
+        return None if None in halos else sum(halos)
+
+    def signature(self):
+        """What process() computes, the same frame gives the same image while this is equal."""
+        return [stage.to_dict() for stage in self.plan()], self.roi, self.level
+
+    def process(self, frame, timings=None):
+        """Run a frame through the plan and return the displayed image.
+
+        If ``timings`` is a list, (stage name, milliseconds) is appended to
+        it for every stage that ran.
+        """
+        plan = self.plan()
+        reduction = (self.roi, self.level)
+        if frame is self._cache_frame and self._cache[0] == reduction:
+            # Same frame again, reuse the outputs of the stages that did not change
+            _, reduced, outputs = self._cache
+            reused = 0
+            while reused < min(len(outputs), len(plan)) and outputs[reused][0] == plan[reused].to_dict():
+                reused += 1
+            outputs = outputs[:reused]
+            image = outputs[-1][1] if outputs else reduced
+        else:
+            if timings is None or not self.level:
+                reduced = self.reduce(frame)
+            else:
+                start = time.perf_counter()
+                reduced = self.reduce(frame)
+                timings.append(("pyramid", (time.perf_counter() - start) * 1000))
+            outputs = []
+            image = reduced
+            halo = self.halo()
+            if self.tiler and plan and halo is not None:
+                images = self.tiler.process(reduced, plan, halo, timings)
+                outputs = [(stage.to_dict(), output) for stage, output in zip(plan, images)]
+                image = images[-1]
+
+        for stage in plan[len(outputs):]:
+            if timings is None:
+                image = stage.apply(image)
+            else:
+                start = time.perf_counter()
+                image = stage.apply(image)
+                timings.append((stage.name, (time.perf_counter() - start) * 1000))
+            outputs.append((stage.to_dict(), image))
+
+        self._cache_frame = frame
+        self._cache = (reduction, reduced, outputs)
+        return image
+
+
+class AdaptiveLevel:
+    """Choose the pyramid level that keeps processing within the frame budget.
+
+    Processing times are smoothed with an exponential moving average. When
+    the average exceeds the budget, processing moves one level down the
+    pyramid, to a quarter of the pixels. It only moves back up when four
+    times the average still leaves ``headroom`` of the budget. After a
+    change the new level runs ``settle`` frames before it is judged.
+    """
+
+    def __init__(self, budget_ms, level=0, max_level=MAX_PYRAMID_LEVEL, headroom=0.7, smoothing=0.2, settle=15):
+        self.budget_ms = budget_ms
+        self.level = level
+        self.max_level = max_level
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.settle = settle
+        self.average_ms = None
+        self.changes = 0
+        self._frames_at_level = 0
+
+    def update(self, ms):
+        """Add the processing time of a frame, returns the level for the next one."""
+        if self.average_ms is None:
+            self.average_ms = ms
+        else:
+            self.average_ms += self.smoothing * (ms - self.average_ms)
+        self._frames_at_level += 1
+        if self._frames_at_level < self.settle:
+            return self.level
+
+        if self.average_ms > self.budget_ms and self.level < self.max_level:
+            self._change(self.level + 1, self.average_ms / 4)
+        elif self.level > 0 and self.average_ms * 4 < self.budget_ms * self.headroom:
+            self._change(self.level - 1, self.average_ms * 4)
+        return self.level
+
+    def _change(self, level, expected_ms):
+        self.level = level
+        self.average_ms = expected_ms
+        self.changes += 1
+        self._frames_at_level = 0
+
+
+DEFAULT_PIPELINE = {
+    "stages": [
+        {"type": "color_convert", "name": "gray", "code": "BGR2GRAY"},
+        {"type": "gaussian_blur", "name": "blurred", "ksize": 5},
+        {"type": "canny", "name": "edges", "low": 70, "high": 130},
+    ],
+    "display": SOURCE,
+}
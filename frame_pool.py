@@ -0,0 +1,186 @@
+from collections import deque
+from multiprocessing import shared_memory
+import multiprocessing as mp
+import os
+import queue
+import sys
+
+from frame_pipeline import Pipeline
+from lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+SLOTS_PER_WORKER = 2  # One frame being processed and one waiting, per worker
+
+
+def _attach(name):
+    """Attach to a shared memory block created by the pool.
+
+    The pool owns the block and unlinks it. Before Python 3.13 attaching
+    registers the block with the resource tracker again, but spawned
+    workers share the pool's tracker, so that registration is the pool's
+    own and must be left for its unlink().
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(input_names, output_names, tasks, results):
+    """Worker process: run the pipeline on frames in shared memory slots."""
+    inputs = [_attach(name) for name in input_names]
+    outputs = [_attach(name) for name in output_names]
+    pipeline, config = None, None
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        slot, seq, shape, dtype, task_config = task
+        try:
+            # Rebuild the pipeline only when its config changed
+            if task_config != config:
+                pipeline, config = Pipeline.from_dict(task_config), task_config
+
+            frame = np.ndarray(shape, dtype=dtype, buffer=inputs[slot].buf)
+            timings = []
+            image = np.ascontiguousarray(pipeline.process(frame, timings))
+            if image.nbytes > outputs[slot].size:
+                raise ValueError(f"Processed frame of {image.nbytes} bytes does not fit its slot")
+            np.ndarray(image.shape, dtype=image.dtype, buffer=outputs[slot].buf)[...] = image
+            results.put((slot, seq, image.shape, image.dtype.str, timings, None))
+        except Exception as error:
+            results.put((slot, seq, None, None, [], repr(error)))
+
+    for shm in inputs + outputs:
+        shm.close()
+
+
+class FramePool:
+    """Run a Pipeline on a pool of worker processes.
+
+    Frames are copied into preallocated shared memory slots instead of being
+    pickled, and processed frames come back through a matching output slot.
+    Results are returned in submission order whatever order the workers
+    finish in. A frame can only be submitted while a slot is free, which
+    bounds the number of frames in flight.
+    """
+
+    def __init__(self, pipeline, workers=None, slots_per_worker=SLOTS_PER_WORKER):
+        self.pipeline = pipeline
+        self.workers = workers or os.cpu_count() or 1
+        self.slot_count = self.workers * slots_per_worker
+        self.slot_size = 0
+        self.errors = 0
+        self.last_error = None
+        self._context = mp.get_context("spawn")
+        self._tasks = None
+        self._results = None
+        self._processes = []
+        self._inputs = []
+        self._outputs = []
+        self._free = []
+        self._order = deque()
+        self._done = {}
+
+    def _start(self, slot_size):
+        """Allocate the slots and start the worker processes."""
+        self.slot_size = slot_size
+        self._inputs = [shared_memory.SharedMemory(create=True, size=slot_size) for _ in range(self.slot_count)]
+        self._outputs = [shared_memory.SharedMemory(create=True, size=slot_size) for _ in range(self.slot_count)]
+        self._free = list(range(self.slot_count))
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+
+        input_names = [shm.name for shm in self._inputs]
+        output_names = [shm.name for shm in self._outputs]
+        for _ in range(self.workers):
+            process = self._context.Process(target=_worker_main, daemon=True,
+                                            args=(input_names, output_names, self._tasks, self._results))
+            process.start()
+            self._processes.append(process)
+
+    @property
+    def in_flight(self):
+        """Number of submitted frames not yet returned by collect()."""
+        return len(self._order)
+
+    def has_free_slot(self):
+        return not self._processes or bool(self._free)
+
+    def submit(self, seq, frame):
+        """Queue a frame for processing, returns False if no slot is free."""
+        if frame.nbytes > self.slot_size:
+            # Slots are sized by the first frame; grow them once the pool is idle
+            if self._order:
+                return False
+            self.close()
+            self._start(frame.nbytes)
+        if not self._free:
+            return False
+
+        slot = self._free.pop()
+        np.ndarray(frame.shape, dtype=frame.dtype, buffer=self._inputs[slot].buf)[...] = frame
+        self._tasks.put((slot, seq, frame.shape, frame.dtype.str, self.pipeline.to_dict()))
+        self._order.append(seq)
+        return True
+
+    def collect(self, timeout=0):
+        """Return finished (seq, image, timings) in submission order.
+
+        Waits up to ``timeout`` seconds for the first result. ``timings`` are
+        the (stage name, ms) pairs measured in the worker. Frames that failed
+        to process are returned with image None. Raises RuntimeError if a
+        worker process died, the frames it held would never come back.
+        """
+        if self._results is None:
+            return []
+        for process in self._processes:
+            if process.exitcode is not None:
+                raise RuntimeError(f"Worker process {process.pid} exited with code {process.exitcode}")
+
+        try:
+            result = self._results.get(timeout=timeout) if timeout else self._results.get_nowait()
+            while True:
+                slot, seq, shape, dtype, timings, error = result
+                self._done[seq] = (slot, shape, dtype, timings, error)
+                result = self._results.get_nowait()
+        except queue.Empty:
+            pass
+
+        ready = []
+        while self._order and self._order[0] in self._done:
+            seq = self._order.popleft()
+            slot, shape, dtype, timings, error = self._done.pop(seq)
+            if error:
+                self.errors += 1
+                self.last_error = error
+                ready.append((seq, None, timings))
+            else:
+                # Copy out, the slot is reused by the next frame
+                image = np.ndarray(shape, dtype=dtype, buffer=self._outputs[slot].buf).copy()
+                ready.append((seq, image, timings))
+            self._free.append(slot)
+        return ready
+
+    def close(self):
+        """Stop the workers and release the shared memory."""
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+        for shm in self._inputs + self._outputs:
+            shm.close()
+            shm.unlink()
+
+        self._processes = []
+        self._inputs = []
+        self._outputs = []
+        self._free = []
+        self._tasks = None
+        self._results = None
+        self._order.clear()
+        self._done.clear()
+        self.slot_size = 0
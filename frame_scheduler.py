@@ -0,0 +1,102 @@
+from collections import deque
+import threading
+
+SCHEDULE_POLICIES = ("latest", "every", "nth")
+QUEUE_SIZE = 32  # Frames the "every" policy holds before the capture thread waits
+
+
+class FrameScheduler:
+    """Hand captured frames over to the processing thread.
+
+    The policy decides which frames get processed:
+
+    ``latest``
+        A single slot. A new frame replaces one that has not been taken
+        yet, so processing always gets the freshest frame and latency is
+        bounded to about one frame.
+    ``every``
+        A FIFO queue of up to ``queue_size`` frames. When it is full the
+        capture thread waits, so nothing is skipped but latency grows with
+        the backlog. Meant for throughput runs and recorded sources.
+    ``nth``
+        Only every ``n``-th captured frame is offered, through a single
+        slot like ``latest``.
+
+    Frames replaced or left out are counted in ``skipped``. Items are
+    (sequence, timestamp, frame) tuples.
+    """
+
+    def __init__(self, policy="latest", n=2, queue_size=QUEUE_SIZE):
+        self._condition = threading.Condition()
+        self._queue = deque()
+        self._closed = False
+        self.queue_size = queue_size
+        self.skipped = 0
+        self.set_policy(policy, n)
+
+    @property
+    def queued(self):
+        return len(self._queue)
+
+    def set_policy(self, policy, n=None):
+        """Switch the policy, returns the number of queued frames it skipped."""
+        if policy not in SCHEDULE_POLICIES:
+            raise ValueError(f"Unknown schedule policy {policy!r}, expected one of {', '.join(SCHEDULE_POLICIES)}")
+        with self._condition:
+            self.policy = policy
+            if n is not None:
+                if n < 1:
+                    raise ValueError("n must be at least 1")
+                self.n = n
+            skipped = 0
+            if policy != "every":
+                while len(self._queue) > 1:
+                    self._queue.popleft()
+                    skipped += 1
+            self.skipped += skipped
+            self._condition.notify_all()
+        return skipped
+
+    def put(self, seq, timestamp, frame):
+        """Offer a captured frame, returns the number of frames skipped by it."""
+        with self._condition:
+            if self._closed:
+                return 0
+            if self.policy == "every":
+                while not self._closed and len(self._queue) >= self.queue_size:
+                    self._condition.wait()
+            elif self.policy == "nth" and seq % self.n:
+                self.skipped += 1
+                return 1
+
+            skipped = 0
+            if self.policy != "every":
+                # The frame still waiting in the slot is replaced
+                skipped = len(self._queue)
+                self._queue.clear()
+            self._queue.append((seq, timestamp, frame))
+            self.skipped += skipped
+            self._condition.notify_all()
+        return skipped
+
+    def take(self):
+        """Return the next frame to process, or None if there is none."""
+        with self._condition:
+            if not self._queue:
+                return None
+            item = self._queue.popleft()
+            self._condition.notify_all()
+        return item
+
+    def get(self, timeout):
+        """Wait up to ``timeout`` seconds for the next frame, see take()."""
+        with self._condition:
+            if not self._queue and not self._closed:
+                self._condition.wait(timeout)
+        return self.take()
+
+    def close(self):
+        """Wake up every waiting thread, later frames are ignored."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
@@ -0,0 +1,302 @@
+import glob
+import os
+import sys
+import time
+
+from lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".npy")
+
+
+def default_backend():
+    """Capture backend for live devices on this platform."""
+    if sys.platform == "win32":
+        return cv2.CAP_DSHOW
+    if sys.platform.startswith("linux"):
+        return cv2.CAP_V4L2
+    return cv2.CAP_ANY
+
+
+class FrameSource:
+    """Base class of the frame sources.
+
+    Sources mirror the parts of cv2.VideoCapture the viewer uses (isOpened,
+    read, get, set, release), so a source can be used wherever a capture is.
+    ``timestamp`` is the media time of the last frame read, in seconds.
+    ``ended`` is set when a read failed because a recorded source has no
+    more frames, rather than because of an error.
+    """
+
+    name = "Frame source"
+
+    def __init__(self):
+        self.timestamp = 0.0
+        self.ended = False
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        raise NotImplementedError
+
+    def get(self, prop):
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        pass
+
+
+class CaptureSource(FrameSource):
+    """Frames from a cv2.VideoCapture, the base of live and file sources."""
+
+    def __init__(self, cap, name):
+        super().__init__()
+        self.cap = cap
+        self.name = name
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if ret:
+            self.timestamp = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+        return ret, frame
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def release(self):
+        self.cap.release()
+
+
+class DeviceSource(CaptureSource):
+    """A live camera, paced by the device itself."""
+
+    def __init__(self, index, backend=None):
+        backend = default_backend() if backend is None else backend
+        super().__init__(cv2.VideoCapture(index, backend), f"Camera {index}")
+        self.index = index
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if ret:
+            self.timestamp = time.monotonic()
+        return ret, frame
+
+
+class VideoFileSource(CaptureSource):
+    """Frames from a video file, timestamped by their position in the file."""
+
+    def __init__(self, path, loop=False):
+        super().__init__(cv2.VideoCapture(path), os.path.basename(path))
+        self.loop = loop
+
+    def read(self):
+        ret, frame = super().read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = super().read()
+        # An opened file that delivers no more frames is at its end
+        self.ended = not ret
+        return ret, frame
+
+
+def load_image(path):
+    """Load an image file as a BGR uint8 frame, like the ones cameras deliver.
+
+    Images are read as 8-bit color whatever their depth and alpha. ``.npy``
+    arrays must be uint8 gray, BGR or BGRA; anything else raises ValueError.
+    """
+    if not path.endswith(".npy"):
+        frame = cv2.imread(path, cv2.IMREAD_COLOR)
+        if frame is None:
+            raise ValueError(f"Cannot read image {path}")
+        return frame
+
+    frame = np.load(path)
+    channels = 1 if frame.ndim == 2 else frame.shape[2] if frame.ndim == 3 else None
+    if frame.dtype != np.uint8 or channels not in (1, 3, 4):
+        raise ValueError(f"{path} holds a {frame.dtype} array of shape {frame.shape}, "
+                         "expected uint8 gray, BGR or BGRA")
+    if channels == 1:
+        return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+    if channels == 4:
+        return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+    return np.ascontiguousarray(frame)
+
+
+class ImageDirectorySource(FrameSource):
+    """Frames from the image files of a directory, in name order, at ``fps``.
+
+    The frame size is that of the first file, which is loaded on opening.
+    """
+
+    def __init__(self, path, fps=30.0, loop=False):
+        super().__init__()
+        self.name = os.path.basename(os.path.normpath(path))
+        self.files = sorted(f for f in glob.glob(os.path.join(path, "*")) if f.lower().endswith(IMAGE_EXTENSIONS))
+        self.fps = fps
+        self.loop = loop
+        self._position = 0
+        self._frame_size = (0, 0)
+        if self.files:
+            frame = load_image(self.files[0])
+            self._frame_size = (frame.shape[1], frame.shape[0])
+
+    def isOpened(self):
+        return bool(self.files)
+
+    def read(self):
+        if self._position >= len(self.files):
+            if not self.loop or not self.files:
+                self.ended = True
+                return False, None
+            self._position = 0
+
+        frame = load_image(self.files[self._position])
+        self.timestamp = self._position / self.fps
+        self._position += 1
+        self._frame_size = (frame.shape[1], frame.shape[0])
+        return True, frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self._frame_size[0]
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self._frame_size[1]
+        return 0.0
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames with moving shapes on a noisy background."""
+
+    def __init__(self, width=1280, height=720, fps=30.0, distinct_frames=30, seed=0):
+        super().__init__()
+        self.name = f"Synthetic {width}x{height}"
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frames = synthetic_frames(width, height, distinct_frames, seed)
+        self._count = 0
+
+    def read(self):
+        frame = self.frames[self._count % len(self.frames)]
+        self.timestamp = self._count / self.fps
+        self._count += 1
+        # Hand out a copy, consumers may keep or modify frames
+        return True, frame.copy()
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.width
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.height
+        return 0.0
+
+
+class PacedSource(FrameSource):
+    """Replay another source in real time, or ``speed`` times faster.
+
+    Frames are released when the wall clock reaches their media timestamp.
+    A speed of 0 disables pacing and reads as fast as possible.
+    """
+
+    def __init__(self, source, speed=1.0):
+        super().__init__()
+        self.source = source
+        self.name = source.name
+        self.speed = speed
+        self._base = None
+
+    def isOpened(self):
+        return self.source.isOpened()
+
+    def read(self):
+        ret, frame = self.source.read()
+        if not ret:
+            self.ended = self.source.ended
+            return ret, frame
+        self.timestamp = self.source.timestamp
+
+        if self.speed > 0:
+            now = time.monotonic()
+            # Start over after the first frame and whenever a looping source restarts
+            if self._base is None or self.timestamp < self._base[1]:
+                self._base = (now, self.timestamp)
+            due = self._base[0] + (self.timestamp - self._base[1]) / self.speed
+            if due > now:
+                time.sleep(due - now)
+        return ret, frame
+
+    def get(self, prop):
+        return self.source.get(prop)
+
+    def set(self, prop, value):
+        return self.source.set(prop, value)
+
+    def release(self):
+        self.source.release()
+
+
+def synthetic_frames(width, height, count, seed=0):
+    """Noisy frames with moving shapes, giving Canny a realistic amount of edges."""
+    rng = np.random.default_rng(seed)
+    background = rng.integers(0, 64, (height, width, 3), dtype=np.uint8)
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        offset = i * width // (4 * count)
+        for k in range(6):
+            x = (k * width // 6 + offset) % width
+            y = (k * height // 7) % height
+            color = tuple(int(c) for c in rng.integers(64, 256, 3))
+            cv2.rectangle(frame, (x, y), (x + width // 10, y + height // 8), color, -1)
+            cv2.circle(frame, (width - x, height - y), height // 12, color, 3)
+        frames.append(frame)
+    return frames
+
+
+def open_source(spec, speed=1.0, loop=False):
+    """Open a frame source from a spec string.
+
+    ``device:<index>``   live camera
+    ``file:<path>``      video file
+    ``dir:<path>``       directory of images, optionally ``dir:<path>@<fps>``
+    ``synthetic[:<width>x<height>[@<fps>]]``  generated frames
+
+    A bare number is a device index and a bare path a file or directory.
+    Recorded and generated sources are paced at ``speed`` (0 is as fast as
+    possible); live devices are never paced.
+    """
+    kind, _, value = spec.partition(":")
+    if kind not in ("device", "file", "dir", "synthetic"):
+        kind, value = ("device", spec) if spec.isdigit() else ("dir" if os.path.isdir(spec) else "file", spec)
+
+    if kind == "device":
+        return DeviceSource(int(value))
+    if kind == "file":
+        source = VideoFileSource(value, loop)
+    elif kind == "dir":
+        path, _, fps = value.partition("@")
+        source = ImageDirectorySource(path, float(fps or 30), loop)
+    elif kind == "synthetic":
+        size, _, fps = (value or "1280x720").partition("@")
+        width, height = (int(v) for v in size.lower().split("x"))
+        source = SyntheticSource(width, height, float(fps or 30))
+    else:
+        raise ValueError(f"Unknown frame source: {spec}")
+    return PacedSource(source, speed)
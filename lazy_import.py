@@ -0,0 +1,32 @@
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """Return module ``name``, executed only when one of its attributes is first used.
+
+    OpenCV and NumPy take a noticeable part of the startup time, with this
+    the viewer window is on screen before they load. Modules imported this
+    way must not be used at import time, e.g. in default arguments.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def load(*modules):
+    """Finish loading lazily imported modules now.
+
+    Before Python 3.12 two threads using a lazy module for the first time
+    at once can break it, so load them on one thread before starting others.
+    """
+    for module in modules:
+        getattr(module, "__name__")
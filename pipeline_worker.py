@@ -0,0 +1,186 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+
+import threading
+
+from frame_pool import FramePool
+
+
+class PipelineWorker(QThread):
+    """Run the processing pipeline on frames from a CaptureWorker.
+
+    Frames are processed inline on this thread, or on a FramePool of worker
+    processes when ``workers`` is set. Like the capture worker it keeps only
+    the newest processed frame, the GUI is notified through
+    ``frame_processed`` and pulls the frame with ``latest_result()``.
+
+    When ``adaptive`` is set to an AdaptiveLevel, the pyramid level of the
+    pipeline follows the measured processing time.
+
+    When ``change_detector`` is set to a ChangeDetector, frames that did
+    not change noticeably are not processed; the last processed image is
+    published again for them, as long as the pipeline settings are the
+    same it was processed with.
+
+    While ``paused`` new frames are discarded and the last one stays on
+    display; reprocess() runs it through the pipeline again, e.g. after a
+    parameter change, which only reruns the stages that changed.
+    """
+
+    frame_processed = pyqtSignal()
+    processing_failed = pyqtSignal(str)
+
+    def __init__(self, capture_worker, pipeline, workers=0, telemetry=None, parent=None):
+        super().__init__(parent)
+        self.capture_worker = capture_worker
+        self.pipeline = pipeline
+        self.workers = workers
+        self.telemetry = telemetry
+        self.recorder = None
+        self.adaptive = None
+        self.change_detector = None
+        self.paused = False
+        self.frames_processed = 0
+        self._running = False
+        self._lock = threading.Lock()
+        self._latest = None
+        self._pending = False
+        self._last_input = None
+        self._last_output = None
+        self._reprocess = False
+
+    def start(self, priority=QThread.Priority.InheritPriority):
+        # Set before the thread runs, so a stop() right after start() is never undone
+        self._running = True
+        super().start(priority)
+
+    def run(self):
+        """Processing loop, runs until stop() is called."""
+        try:
+            if self.workers:
+                self._run_pool()
+            else:
+                self._run_inline()
+        except Exception as error:
+            self.processing_failed.emit(f"Processing error: {error!r}")
+
+    def _run_inline(self):
+        while self._running:
+            self._reprocess_last()
+            latest = self.capture_worker.wait_frame(0.1)
+            if latest and not self.paused:
+                seq, timestamp, frame = latest
+                if self._unchanged(frame, self.pipeline.signature()):
+                    self._publish_unchanged(seq, timestamp)
+                    continue
+                timings = []
+                image = self.pipeline.process(frame, timings)
+                self._publish(seq, timestamp, image, timings, frame)
+
+    def _run_pool(self):
+        pool = FramePool(self.pipeline, self.workers)
+        inputs = {}
+        try:
+            while self._running:
+                # Reprocessing a paused frame runs on this thread, it reuses the stage outputs
+                self._reprocess_last()
+
+                # Feed the pool while it has room, otherwise wait for results
+                if pool.has_free_slot():
+                    latest = self.capture_worker.wait_frame(0.01)
+                    if latest and not self.paused:
+                        seq, timestamp, frame = latest
+                        # The settings a frame is submitted with, they may change until its result is back
+                        signature = self.pipeline.signature()
+                        if self._unchanged(frame, signature):
+                            self._publish_unchanged(seq, timestamp)
+                        elif pool.submit(seq, frame):
+                            inputs[seq] = (timestamp, frame, signature)
+                    results = pool.collect()
+                else:
+                    results = pool.collect(timeout=0.1)
+
+                for seq, image, timings in results:
+                    timestamp, frame, signature = inputs.pop(seq)
+                    if image is None:
+                        # Fail like the inline loop, which stops on the exception
+                        self.processing_failed.emit(f"Processing error: {pool.last_error}")
+                        return
+                    self._publish(seq, timestamp, image, timings, frame, signature=signature)
+        finally:
+            pool.close()
+
+    def reprocess(self):
+        """Run the last frame through the pipeline again on the processing thread."""
+        with self._lock:
+            self._reprocess = True
+
+    def _reprocess_last(self):
+        with self._lock:
+            requested, self._reprocess = self._reprocess, False
+        if not requested or self._last_input is None:
+            return
+        seq, timestamp, frame = self._last_input
+        timings = []
+        image = self.pipeline.process(frame, timings)
+        # Only part of the pipeline ran, so the timings do not steer the adaptive level
+        self._publish(seq, timestamp, image, timings, frame, adapt=False)
+
+    def _unchanged(self, frame, signature):
+        """True if ``frame`` can reuse the last processed image."""
+        detector = self.change_detector
+        if detector is None:
+            return False
+        if self._last_output is None or self._last_output[0] != signature:
+            # Nothing to reuse for these settings, process the frame and compare against it from now on
+            detector.reset()
+        return not detector.check(frame)
+
+    def _publish_unchanged(self, seq, timestamp):
+        _, image = self._last_output
+        self._publish(seq, timestamp, image, [], None, adapt=False)
+
+    def _adapt(self, timings):
+        adaptive = self.adaptive
+        if adaptive:
+            # Worker processes run in parallel, each frame may take that much longer
+            ms = sum(ms for _, ms in timings) / max(1, self.workers)
+            self.pipeline.set_level(adaptive.update(ms))
+
+    def _publish(self, seq, timestamp, image, timings, frame, adapt=True, signature=None):
+        # Without a frame the image is a reused one, the processed frame stays the one to reprocess
+        if frame is not None:
+            self._last_input = (seq, timestamp, frame)
+            self._last_output = (signature or self.pipeline.signature(), image)
+        if adapt:
+            self._adapt(timings)
+        if self.telemetry:
+            self.telemetry.record_processed(timings, unchanged=frame is None)
+
+        recorder = self.recorder
+        if recorder:
+            recorder.write(image, timestamp)
+
+        with self._lock:
+            self.frames_processed += 1
+            self._latest = (seq, timestamp, image)
+            notify = not self._pending
+            self._pending = True
+
+        if notify:
+            self.frame_processed.emit()
+
+    def latest_result(self):
+        """Return the newest (sequence, timestamp, image) and mark it consumed.
+
+        Returns None if no frame has been processed since the last call.
+        """
+        with self._lock:
+            latest = self._latest
+            self._latest = None
+            self._pending = False
+        return latest
+
+    def stop(self):
+        """Stop the processing loop and wait for the thread to finish."""
+        self._running = False
+        self.wait()
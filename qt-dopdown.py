@@ -3,8 +3,8 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QIcon
 
 import sys
-import cv2
-import wmi
+
+from camera_discovery import list_camera_devices
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -30,31 +30,7 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.combo_box)
 
 def list_available_cameras():
-    available_cameras = []
-    max_camera_index = 10
-
-    c = wmi.WMI()
-    wmi_devices = c.Win32_PnPEntity(PNPClass="Camera")
-
-    print(f"Found {len(wmi_devices)} imaging devices via WMI")
-    for device in wmi_devices:
-        print(f"Device: {device.Name}")
-        print(f"Device ID: {device.DeviceID}")
-
-    for index in range(max_camera_index):
-        cap = cv2.VideoCapture(index, cv2.CAP_DSHOW)
-        if cap.isOpened():
-            ret, frame = cap.read()
-            if ret:
-                print(f"Camera {index} is working.")
-                if index < len(wmi_devices):
-                    available_cameras.append((index, wmi_devices[index].Name))
-                else:
-                    available_cameras.append((index, f"Unknown Camera {index}"))
-
-        cap.release()
-
-    return available_cameras
+    return list_camera_devices(on_camera=lambda camera: print(f"Camera {camera.index} is working."))
 
 app = QApplication(sys.argv)
 window = MainWindow()
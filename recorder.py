@@ -0,0 +1,151 @@
+from collections import deque
+from datetime import datetime
+import os
+import threading
+import time
+
+from lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest")
+SIZE_CHECK_INTERVAL = 30  # Frames between file size checks when rolling by size
+
+
+class Recorder:
+    """Write frames to video files from a dedicated encoder thread.
+
+    Frames are handed over through a bounded queue. When it is full the
+    overflow policy decides: ``block`` waits for room (back-pressure on the
+    producer), ``drop_oldest`` discards the oldest queued frame and
+    ``drop_newest`` discards the frame being written. Dropped frames are
+    counted. Output is split into segments of ``segment_seconds`` and/or
+    ``segment_bytes``, and whenever the frame size or channel count changes.
+    """
+
+    def __init__(self, directory, prefix="recording", fps=30.0, fourcc="mp4v", extension=".mp4",
+                 queue_size=64, overflow="drop_oldest", segment_seconds=None, segment_bytes=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow!r}, expected one of {', '.join(OVERFLOW_POLICIES)}")
+        self.directory = directory
+        self.prefix = prefix
+        self.fps = fps
+        self.fourcc = fourcc
+        self.extension = extension
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.segment_seconds = segment_seconds
+        self.segment_bytes = segment_bytes
+
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.segments = []
+        self.error = None
+
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._writer = None
+        self._segment_shape = None
+        self._segment_start = None
+        self._segment_frames = 0
+
+    @property
+    def queued(self):
+        return len(self._queue)
+
+    @property
+    def current_segment(self):
+        return self.segments[-1] if self.segments else None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="recorder", daemon=True)
+        self._thread.start()
+
+    def write(self, frame, timestamp=None):
+        """Queue a frame for encoding, returns False if it was dropped."""
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        with self._condition:
+            if not self._running:
+                return False
+            if len(self._queue) >= self.queue_size:
+                if self.overflow == "drop_newest":
+                    self.frames_dropped += 1
+                    return False
+                if self.overflow == "drop_oldest":
+                    self._queue.popleft()
+                    self.frames_dropped += 1
+                else:
+                    while self._running and len(self._queue) >= self.queue_size:
+                        self._condition.wait()
+            self._queue.append((frame, timestamp))
+            self._condition.notify_all()
+        return True
+
+    def stop(self):
+        """Encode the queued frames, close the file and stop the thread."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        try:
+            while True:
+                with self._condition:
+                    while self._running and not self._queue:
+                        self._condition.wait()
+                    if not self._queue:
+                        break
+                    frame, timestamp = self._queue.popleft()
+                    self._condition.notify_all()
+                self._encode(frame, timestamp)
+        except Exception as error:
+            self.error = error
+            with self._condition:
+                self._running = False
+                self.frames_dropped += len(self._queue)
+                self._queue.clear()
+                self._condition.notify_all()
+        finally:
+            self._close_segment()
+
+    def _encode(self, frame, timestamp):
+        if self._writer is None or self._segment_full(frame, timestamp):
+            self._open_segment(frame, timestamp)
+        self._writer.write(frame)
+        self._segment_frames += 1
+        self.frames_written += 1
+
+    def _segment_full(self, frame, timestamp):
+        if frame.shape != self._segment_shape:
+            return True
+        if self.segment_seconds and timestamp - self._segment_start >= self.segment_seconds:
+            return True
+        if self.segment_bytes and self._segment_frames % SIZE_CHECK_INTERVAL == 0:
+            return os.path.getsize(self.current_segment) >= self.segment_bytes
+        return False
+
+    def _open_segment(self, frame, timestamp):
+        self._close_segment()
+        name = f"{self.prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}{self.extension}"
+        path = os.path.join(self.directory, name)
+        height, width = frame.shape[:2]
+        self._writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (width, height),
+                                       frame.ndim == 3)
+        if not self._writer.isOpened():
+            raise RuntimeError(f"Cannot open video writer for {path}")
+        self.segments.append(path)
+        self._segment_shape = frame.shape
+        self._segment_start = timestamp
+        self._segment_frames = 0
+
+    def _close_segment(self):
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
@@ -0,0 +1,276 @@
+from collections import deque
+from datetime import datetime
+import json
+import os
+import tempfile
+import threading
+import time
+
+from lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+RAM_BUDGET = 512 * 2**20  # Rings larger than this are memory-mapped to a file
+
+
+class FrameRingBuffer:
+    """The last ``capacity`` frames in one contiguous preallocated array.
+
+    Storage is allocated on the first frame, as an in-memory array or, when
+    it would exceed ``ram_budget`` bytes, as a memory-mapped file in
+    ``spill_dir``. A change of frame shape starts the ring over.
+    """
+
+    def __init__(self, capacity, ram_budget=RAM_BUDGET, spill_dir=None):
+        self.capacity = max(1, int(capacity))
+        self.ram_budget = ram_budget
+        self.spill_dir = spill_dir
+        self.spill_path = None
+        self._lock = threading.Lock()
+        self._frames = None
+        self._seqs = np.zeros(self.capacity, dtype=np.int64)
+        self._timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def spilled(self):
+        return self.spill_path is not None
+
+    def _allocate(self, shape, dtype):
+        nbytes = self.capacity * int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if nbytes > self.ram_budget:
+            if self.spill_dir:
+                os.makedirs(self.spill_dir, exist_ok=True)
+            fd, self.spill_path = tempfile.mkstemp(prefix="ring_", suffix=".raw", dir=self.spill_dir)
+            os.close(fd)
+            self._frames = np.memmap(self.spill_path, dtype=dtype, mode="w+", shape=(self.capacity,) + shape)
+        else:
+            self.spill_path = None
+            self._frames = np.empty((self.capacity,) + shape, dtype=dtype)
+        self._next = 0
+        self._count = 0
+
+    def push(self, frame, seq, timestamp):
+        """Copy a frame into the oldest slot."""
+        with self._lock:
+            if self._frames is None or self._frames.shape[1:] != frame.shape or self._frames.dtype != frame.dtype:
+                if self._frames is not None:
+                    FrozenFrames(self._frames, [], [], [], self.spill_path).release()
+                self._allocate(frame.shape, frame.dtype)
+            slot = self._next
+            self._frames[slot] = frame
+            self._seqs[slot] = seq
+            self._timestamps[slot] = timestamp
+            self._next = (slot + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def detach(self):
+        """Hand the buffered frames over and start again with fresh storage.
+
+        Nothing is copied: the storage itself moves to the returned
+        FrozenFrames, so the producer never waits for it to be written out.
+        """
+        with self._lock:
+            start = (self._next - self._count) % self.capacity
+            order = [(start + i) % self.capacity for i in range(self._count)]
+            frozen = FrozenFrames(self._frames, order, self._seqs[order].tolist(),
+                                  self._timestamps[order].tolist(), self.spill_path)
+            self._frames = None
+            self.spill_path = None
+            self._next = 0
+            self._count = 0
+        return frozen
+
+
+class FrozenFrames:
+    """Frames taken out of a FrameRingBuffer, in capture order."""
+
+    def __init__(self, frames, order, seqs, timestamps, spill_path):
+        self.frames = frames
+        self.order = order
+        self.seqs = seqs
+        self.timestamps = timestamps
+        self.spill_path = spill_path
+
+    def __len__(self):
+        return len(self.order)
+
+    def __iter__(self):
+        for slot, seq, timestamp in zip(self.order, self.seqs, self.timestamps):
+            yield seq, timestamp, self.frames[slot]
+
+    def release(self):
+        """Free the storage, removing the spill file if there is one."""
+        self.frames = None
+        if self.spill_path:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass  # Still mapped on Windows, left for the temp directory cleanup
+            self.spill_path = None
+
+
+class TriggerDump:
+    """Write the frames before a trigger and the next ``post_seconds`` to a file.
+
+    The pre-trigger frames come from a FrozenFrames, the post-trigger frames
+    are passed to add() by the producer. Encoding runs on its own thread.
+    A JSON sidecar lists the sequence number and timestamp of every frame.
+    """
+
+    def __init__(self, frozen, post_seconds, path, fps, fourcc="mp4v"):
+        self.frozen = frozen
+        self.post_seconds = post_seconds
+        self.path = path
+        self.fps = fps
+        self.fourcc = fourcc
+        self.trigger_time = time.time()
+        self.frames_written = 0
+        self.error = None
+        self._post = deque()
+        self._condition = threading.Condition()
+        self._collecting = True
+        self._thread = threading.Thread(target=self._run, name="trigger-dump", daemon=True)
+
+    @property
+    def done(self):
+        return not self._thread.is_alive()
+
+    def start(self):
+        if self.post_seconds <= 0:
+            self._collecting = False
+        self._thread.start()
+
+    def add(self, frame, seq, timestamp):
+        """Queue a post-trigger frame, returns False once the post window is over."""
+        with self._condition:
+            if not self._collecting:
+                return False
+            if timestamp - self.trigger_time > self.post_seconds:
+                self._collecting = False
+                self._condition.notify_all()
+                return False
+            self._post.append((seq, timestamp, frame))
+            self._condition.notify_all()
+        return True
+
+    def finish(self):
+        """Stop collecting post-trigger frames and wait for the file."""
+        with self._condition:
+            self._collecting = False
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        writer = None
+        frame = None
+        index = []
+        try:
+            for seq, timestamp, frame in self._frames():
+                if writer is None:
+                    height, width = frame.shape[:2]
+                    writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps,
+                                             (width, height), frame.ndim == 3)
+                    if not writer.isOpened():
+                        raise RuntimeError(f"Cannot open video writer for {self.path}")
+                writer.write(frame)
+                index.append({"seq": int(seq), "timestamp": timestamp, "pre_trigger": timestamp < self.trigger_time})
+                self.frames_written += 1
+        except Exception as error:
+            self.error = error
+        finally:
+            if writer is not None:
+                writer.release()
+            frame = None
+            self.frozen.release()
+            with self._condition:
+                self._collecting = False
+                self._post.clear()
+            try:
+                with open(os.path.splitext(self.path)[0] + ".json", "w") as f:
+                    json.dump({"trigger_time": self.trigger_time, "fps": self.fps, "frames": index}, f, indent=1)
+            except OSError as error:
+                # Reported like an encoding error, which is kept if there was one
+                if self.error is None:
+                    self.error = error
+
+    def _frames(self):
+        yield from self.frozen
+        while True:
+            with self._condition:
+                while self._collecting and not self._post:
+                    self._condition.wait()
+                if not self._post:
+                    return
+                item = self._post.popleft()
+            yield item
+
+
+class PreTriggerRecorder:
+    """Keep the last seconds of frames and dump them to disk on a trigger.
+
+    feed() is called by the capture thread with every frame; trigger() may
+    be called from any thread. A trigger swaps the ring storage out, so
+    capture continues into fresh storage while the dump is written. Frames
+    fed after close() are ignored, the capture thread may still hold the
+    recorder for one more frame.
+    """
+
+    def __init__(self, pre_seconds, post_seconds, fps, directory="triggers", ram_budget=RAM_BUDGET):
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.fps = fps
+        self.directory = directory
+        self.ring = FrameRingBuffer(pre_seconds * fps, ram_budget, directory)
+        self.dumps = []
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self):
+        return sum(not dump.done for dump in self.dumps)
+
+    def feed(self, frame, seq, timestamp):
+        # Held across push and hand-off so a trigger never falls between them
+        with self._lock:
+            if self._closed:
+                # Pushing would allocate fresh storage, a spill file included, that nothing releases
+                return
+            self.ring.push(frame, seq, timestamp)
+            collecting = [dump for dump in self.dumps if not dump.done]
+        for dump in collecting:
+            dump.add(frame, seq, timestamp)
+
+    def trigger(self, post_seconds=None):
+        """Dump the buffered frames plus the next ``post_seconds``, returns the TriggerDump."""
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"trigger_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.mp4"
+        post_seconds = self.post_seconds if post_seconds is None else post_seconds
+        with self._lock:
+            dump = TriggerDump(self.ring.detach(), post_seconds, os.path.join(self.directory, name), self.fps)
+            dump.start()
+            self.dumps.append(dump)
+        return dump
+
+    def finished(self):
+        """Remove and return the dumps that have been written."""
+        with self._lock:
+            finished = [dump for dump in self.dumps if dump.done]
+            self.dumps = [dump for dump in self.dumps if not dump.done]
+        return finished
+
+    def close(self):
+        """Finish pending dumps and free the ring, returns the dumps not yet collected."""
+        with self._lock:
+            self._closed = True
+            dumps, self.dumps = self.dumps, []
+            ring = self.ring.detach()
+        for dump in dumps:
+            dump.finish()
+        ring.release()
+        return dumps
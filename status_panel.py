@@ -0,0 +1,49 @@
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QLabel, QVBoxLayout, QWidget
+
+
+class StatusPanel(QWidget):
+    """Status fields shown as one label each.
+
+    set_fields() takes all fields of the panel as (key, text) pairs in
+    display order. Only labels whose text changed are redrawn, and labels
+    are only created, removed or reordered when the keys change, so a
+    periodic refresh costs next to nothing when little has changed.
+    set_field() updates a single field, e.g. from a change notification.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(4, 4, 4, 4)
+        self._layout.setSpacing(1)
+        self._layout.addStretch()
+        self._labels = {}
+        self._keys = []
+
+    def set_fields(self, fields):
+        keys = [key for key, _ in fields]
+        if keys != self._keys:
+            self._relayout(keys)
+        for key, text in fields:
+            self.set_field(key, text)
+
+    def set_field(self, key, text):
+        """Change the text of one field, nothing happens for unknown keys."""
+        label = self._labels.get(key)
+        if label is not None and label.text() != text:
+            label.setText(text)
+
+    def _relayout(self, keys):
+        for key in set(self._labels) - set(keys):
+            self._labels.pop(key).deleteLater()
+        while self._layout.count():
+            self._layout.takeAt(0)
+        for key in keys:
+            if key not in self._labels:
+                label = QLabel()
+                label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+                self._labels[key] = label
+            self._layout.addWidget(self._labels[key])
+        self._layout.addStretch()
+        self._keys = keys
@@ -0,0 +1,185 @@
+from collections import deque
+from datetime import datetime
+import json
+import threading
+import time
+
+METRICS_WINDOW = 5.0       # Seconds covered by the rolling metrics
+MAX_LATENCY_SAMPLES = 2000  # Per stage, bounds memory at high frame rates
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class RollingRate:
+    """Events per second over the last ``window`` seconds."""
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self.count = 0
+        self._start = None
+        self._times = deque()
+
+    def tick(self, now):
+        if self._start is None:
+            self._start = now
+        self.count += 1
+        self._times.append(now)
+        self._expire(now)
+
+    def rate(self, now):
+        self._expire(now)
+        if self._start is None:
+            return 0.0
+        # Use the time since the first event until the window has filled up
+        span = min(self.window, now - self._start)
+        return len(self._times) / span if span > 0 else 0.0
+
+    def _expire(self, now):
+        while self._times and now - self._times[0] > self.window:
+            self._times.popleft()
+
+
+class LatencyWindow:
+    """Latency samples in milliseconds over the last ``window`` seconds."""
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self._samples = deque(maxlen=MAX_LATENCY_SAMPLES)
+
+    def add(self, now, ms):
+        self._samples.append((now, ms))
+
+    def percentiles(self, now):
+        """Return {"p50", "p95", "p99"} of the samples in the window."""
+        while self._samples and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+        values = sorted(ms for _, ms in self._samples)
+        return {"p50": percentile(values, 0.50), "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99)}
+
+
+class Telemetry:
+    """Rolling capture, processing and display metrics of one camera.
+
+    Record methods may be called from the capture, processing and GUI
+    threads; snapshot() returns a consistent, JSON serialisable view.
+    """
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.capture = RollingRate(self.window)
+            self.processing = RollingRate(self.window)
+            self.display = RollingRate(self.window)
+            self.unchanged = RollingRate(self.window)
+            self.stages = {}
+            self.dropped = 0
+            self.skipped = 0
+            self._last_displayed_seq = None
+            # Skipped frames not yet matched with a gap in the displayed sequence
+            self._unmatched_skips = 0
+
+    def record_capture(self):
+        with self._lock:
+            self.capture.tick(time.monotonic())
+
+    def record_skipped(self, count=1):
+        """Count frames the scheduler did not pass on for processing.
+
+        Skipping is intended, so the gaps these frames leave in the
+        displayed sequence are not counted as drops.
+        """
+        with self._lock:
+            self.skipped += count
+            self._unmatched_skips += count
+
+    def record_processed(self, timings, unchanged=False):
+        """Count a processed frame, ``timings`` are (stage name, ms) pairs.
+
+        ``unchanged`` frames reused the previous output without processing.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.processing.tick(now)
+            if unchanged:
+                self.unchanged.tick(now)
+            for name, ms in timings:
+                self._stage(name).add(now, ms)
+
+    def record_stage(self, name, ms):
+        with self._lock:
+            self._stage(name).add(time.monotonic(), ms)
+
+    def record_display(self, seq):
+        """Count a displayed frame, gaps in ``seq`` are drops.
+
+        Gaps left by skipped frames are not counted. A frame shown again
+        under its sequence number, e.g. reprocessed while paused, is no drop.
+        """
+        with self._lock:
+            self.display.tick(time.monotonic())
+            last = self._last_displayed_seq
+            if last is not None:
+                if seq > last + 1:
+                    gap = seq - last - 1
+                    skipped = min(gap, self._unmatched_skips)
+                    self._unmatched_skips -= skipped
+                    self.dropped += gap - skipped
+            self._last_displayed_seq = seq
+
+    def _stage(self, name):
+        if name not in self.stages:
+            self.stages[name] = LatencyWindow(self.window)
+        return self.stages[name]
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            processing_fps = self.processing.rate(now)
+            return {
+                "capture_fps": self.capture.rate(now),
+                "processing_fps": processing_fps,
+                "display_fps": self.display.rate(now),
+                "frames_captured": self.capture.count,
+                "frames_displayed": self.display.count,
+                "dropped": self.dropped,
+                "skipped": self.skipped,
+                "unchanged": self.unchanged.count,
+                # Share of the recently processed frames that reused the previous output
+                "unchanged_rate": min(1.0, self.unchanged.rate(now) / processing_fps) if processing_fps else 0.0,
+                "stages_ms": {name: stage.percentiles(now) for name, stage in self.stages.items()},
+            }
+
+
+class MetricsExporter:
+    """Append telemetry snapshots to a JSON lines file every ``interval`` seconds.
+
+    Snapshots exported under different keys, e.g. one per camera, have
+    their own interval.
+    """
+
+    def __init__(self, path, interval=5.0):
+        self.path = path
+        self.interval = interval
+        self._last_export = {}
+
+    def maybe_export(self, snapshot, key=None, **extra):
+        """Write the snapshot if the interval has passed since the last write for ``key``."""
+        now = time.time()
+        if now - self._last_export.get(key, 0.0) < self.interval:
+            return False
+        self._last_export[key] = now
+        record = dict(time=datetime.fromtimestamp(now).isoformat(timespec="milliseconds"), **extra, **snapshot)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        return True
@@ -0,0 +1,90 @@
+import cv2
+
+from capture_modes import CaptureMode, fourcc_to_str, negotiate, prepare_mode
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCapture:
+    """A scripted camera backend.
+
+    ``modes`` maps (fourcc, width, height) to {promised fps: delivered fps}.
+    Requests for other modes snap to ``fallback``, like drivers do.
+    """
+
+    def __init__(self, modes, clock, fallback=("YUYV", 640, 480)):
+        self.modes = modes
+        self.clock = clock
+        self.fallback = fallback
+        self.requested = {cv2.CAP_PROP_FOURCC: "", cv2.CAP_PROP_FRAME_WIDTH: 0,
+                          cv2.CAP_PROP_FRAME_HEIGHT: 0, cv2.CAP_PROP_FPS: 0}
+        self.sets = 0
+
+    def _active(self):
+        key = (self.requested[cv2.CAP_PROP_FOURCC], int(self.requested[cv2.CAP_PROP_FRAME_WIDTH]),
+               int(self.requested[cv2.CAP_PROP_FRAME_HEIGHT]))
+        if key not in self.modes:
+            key = self.fallback
+        rates = self.modes[key]
+        fps = self.requested[cv2.CAP_PROP_FPS]
+        return key, fps if fps in rates else next(iter(rates))
+
+    def set(self, prop, value):
+        self.sets += 1
+        self.requested[prop] = fourcc_to_str(value) if prop == cv2.CAP_PROP_FOURCC else value
+        return True
+
+    def get(self, prop):
+        (fourcc, width, height), fps = self._active()
+        if prop == cv2.CAP_PROP_FOURCC:
+            return float(cv2.VideoWriter_fourcc(*fourcc))
+        return {cv2.CAP_PROP_FRAME_WIDTH: width, cv2.CAP_PROP_FRAME_HEIGHT: height, cv2.CAP_PROP_FPS: fps}[prop]
+
+    def read(self):
+        key, fps = self._active()
+        self.clock.now += 1 / self.modes[key][fps]
+        return True, None
+
+
+def test_negotiate_rejects_a_mode_that_delivers_too_few_frames():
+    clock = FakeClock()
+    cap = FakeCapture({("MJPG", 1280, 720): {60: 25},
+                       ("MJPG", 1920, 1080): {30: 30},
+                       ("YUYV", 640, 480): {30: 30}}, clock)
+
+    mode, modes = negotiate(cap, "max_fps:720", clock=clock)
+
+    assert CaptureMode("MJPG", 1280, 720, 60) in modes
+    assert (mode.fourcc, mode.width, mode.height) == ("MJPG", 1920, 1080)
+    assert mode.fps == 30
+    assert (cap.get(cv2.CAP_PROP_FRAME_WIDTH), cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) == (1920, 1080)
+
+
+def test_negotiate_settles_for_the_fastest_measured_mode():
+    clock = FakeClock()
+    cap = FakeCapture({("MJPG", 1280, 720): {60: 20},
+                       ("MJPG", 1920, 1080): {30: 12},
+                       ("YUYV", 640, 480): {30: 10}}, clock)
+
+    mode, _ = negotiate(cap, "max_fps:720", clock=clock)
+
+    assert (mode.fourcc, mode.width, mode.height) == ("MJPG", 1280, 720)
+    assert mode.fps == 20
+    assert cap.get(cv2.CAP_PROP_FRAME_WIDTH) == 1280
+
+
+def test_prepare_mode_uses_the_cached_mode_without_listing():
+    clock = FakeClock()
+    cap = FakeCapture({("MJPG", 1920, 1080): {30: 30}, ("YUYV", 640, 480): {30: 30}}, clock)
+    cached = CaptureMode("MJPG", 1920, 1080, 30)
+
+    mode, modes = prepare_mode(cap, "max_fps", cached)
+
+    assert (mode, modes) == (cached, None)
+    assert cap.sets == 4
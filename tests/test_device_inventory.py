@@ -0,0 +1,30 @@
+import json
+
+from camera_discovery import CameraDevice
+from device_inventory import DeviceInventory, INVENTORY_VERSION
+
+
+def test_cache_with_frame_sources_loads(tmp_path):
+    path = tmp_path / "inventory.json"
+    path.write_text(json.dumps({"version": INVENTORY_VERSION, "devices": {
+        "v4l2:1-2:1.0": {"index": 2, "name": "Back"},
+        "source:synthetic:640x480": {"index": None, "name": "synthetic:640x480"},
+        "v4l2:1-1:1.0": {"index": 0, "name": "Front"},
+    }}))
+
+    cameras = DeviceInventory(str(path)).cameras()
+
+    assert cameras == [CameraDevice(0, "Front", "v4l2:1-1:1.0"), CameraDevice(2, "Back", "v4l2:1-2:1.0")]
+
+
+def test_frame_sources_are_not_cached(tmp_path):
+    path = tmp_path / "inventory.json"
+    inventory = DeviceInventory(str(path))
+    source = CameraDevice(None, "synthetic:640x480", "source:synthetic:640x480")
+
+    added, _, _ = inventory.update([CameraDevice(0, "Front", "v4l2:1-1:1.0"), source])
+    assert inventory.save()
+
+    assert added == ["v4l2:1-1:1.0"]
+    assert list(json.loads(path.read_text())["devices"]) == ["v4l2:1-1:1.0"]
+    assert DeviceInventory(str(path)).cameras() == [CameraDevice(0, "Front", "v4l2:1-1:1.0")]
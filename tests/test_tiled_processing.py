@@ -0,0 +1,43 @@
+import cv2
+import numpy as np
+
+from frame_pipeline import Pipeline, DEFAULT_PIPELINE
+from frame_sources import synthetic_frames
+
+
+def edge_pipelines():
+    config = dict(DEFAULT_PIPELINE, display="edges")
+    full = Pipeline.from_dict(config)
+    tiled = Pipeline.from_dict(dict(config, tiles=64))
+    # Compare every frame here instead of letting the tiler correct itself
+    tiled.tiler.verify_interval = 0
+    return full, tiled
+
+
+def compare(frames):
+    """Largest fraction of edge pixels differing between tiled and full processing."""
+    full, tiled = edge_pipelines()
+    worst = 0.0
+    for frame in frames:
+        expected = full.process(frame)
+        result = tiled.process(frame)
+        assert result.shape == expected.shape
+        worst = max(worst, np.count_nonzero(result != expected) / result.size)
+    assert tiled.tiler.dirty_fraction < tiled.tiler.full_fraction, "frames were not processed in tiles"
+    return worst
+
+
+def test_small_motion_matches_full_canny():
+    rng = np.random.default_rng(1)
+    background = rng.integers(0, 64, (480, 640, 3), dtype=np.uint8)
+    frames = []
+    for x in range(100, 130, 3):
+        frame = background.copy()
+        cv2.rectangle(frame, (x, 200), (x + 40, 240), (200, 180, 90), -1)
+        frames.append(frame)
+    assert compare(frames) == 0
+
+
+def test_moving_shapes_match_full_canny_closely():
+    # Hysteresis can follow an edge chain across the halo, so allow a few pixels
+    assert compare(synthetic_frames(1280, 720, 20)) < 1e-4
@@ -0,0 +1,63 @@
+import os
+
+from v4l2_devices import (Capability, CAP_VIDEO_CAPTURE, CAP_VIDEO_CAPTURE_MPLANE, list_v4l2_cameras,
+                          list_v4l2_devices)
+
+CAP_META_CAPTURE = 0x00800000
+
+
+def make_sysfs(root, nodes):
+    """Build a fake /sys/class/video4linux, ``nodes`` maps index to (name, device, node index)."""
+    sysfs = root / "video4linux"
+    sysfs.mkdir()
+    for index, (name, device, node_index) in nodes.items():
+        device_dir = root / "devices" / device
+        device_dir.mkdir(parents=True, exist_ok=True)
+        node = sysfs / f"video{index}"
+        node.mkdir()
+        (node / "name").write_text(name + "\n")
+        (node / "index").write_text(f"{node_index}\n")
+        os.symlink(device_dir, node / "device")
+    # Not a video node
+    (sysfs / "v4l-subdev0").mkdir()
+    return str(sysfs)
+
+
+def fake_query(capabilities):
+    """A VIDIOC_QUERYCAP stand-in answering from a {index: capabilities} map."""
+    def query(path):
+        index = int(path.rsplit("video", 1)[1])
+        if index not in capabilities:
+            return None
+        return Capability("uvcvideo", f"Card {index}", f"usb-0000:00:14.0-{index}", capabilities[index])
+    return query
+
+
+def test_metadata_nodes_are_skipped(tmp_path):
+    sysfs = make_sysfs(tmp_path, {0: ("Front", "1-1:1.0", 0), 1: ("Front", "1-1:1.0", 1),
+                                  2: ("Back", "1-2:1.0", 0), 3: ("Back", "1-2:1.0", 1),
+                                  10: ("ISP", "platform-isp", 0)})
+    query = fake_query({0: CAP_VIDEO_CAPTURE, 1: CAP_META_CAPTURE, 2: CAP_VIDEO_CAPTURE,
+                        3: CAP_META_CAPTURE, 10: CAP_VIDEO_CAPTURE_MPLANE})
+
+    devices = list_v4l2_devices(sysfs, "/dev", query)
+    assert [device.index for device in devices] == [0, 1, 2, 3, 10]
+
+    cameras = list_v4l2_cameras(sysfs, "/dev", query)
+    assert [(camera.index, camera.name, camera.bus_id, camera.path) for camera in cameras] == [
+        (0, "Card 0", "1-1:1.0", "/dev/video0"),
+        (2, "Card 2", "1-2:1.0", "/dev/video2"),
+        (10, "Card 10", "platform-isp", "/dev/video10"),
+    ]
+
+
+def test_unqueried_nodes_fall_back_to_sysfs(tmp_path):
+    sysfs = make_sysfs(tmp_path, {0: ("Front", "1-1:1.0", 0), 1: ("Front", "1-1:1.0", 1)})
+
+    cameras = list_v4l2_cameras(sysfs, "/dev", fake_query({}))
+
+    assert [(camera.index, camera.name, camera.capture) for camera in cameras] == [(0, "Front", None)]
+
+
+def test_missing_sysfs_lists_nothing(tmp_path):
+    assert list_v4l2_cameras(str(tmp_path / "missing"), "/dev", fake_query({})) == []
@@ -0,0 +1,151 @@
+import time
+
+from lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+TILE_SIZE = 64            # Side of a tile in processed pixels
+TILE_THRESHOLD = 16       # Gray levels a pixel has to change by to count as changed
+TILE_MIN_PIXELS = 4       # Changed pixels that make a tile dirty
+TILE_MARGIN = 8           # Extra halo around dirty tiles for effects that reach further than the kernels
+FULL_FRAME_FRACTION = 0.5  # Above this fraction of dirty tiles the whole frame is processed
+VERIFY_INTERVAL = 30      # Every this many frames the tiled result is checked against a full run
+
+
+def dirty_tiles(image, reference, tile_size=TILE_SIZE, threshold=TILE_THRESHOLD, min_pixels=TILE_MIN_PIXELS):
+    """Boolean grid of the tiles in which ``image`` differs from ``reference``.
+
+    Color differences are weighted like a gray conversion, which is never
+    less than the difference of the gray images.
+    """
+    difference = cv2.absdiff(image, reference)
+    if difference.ndim == 3:
+        difference = cv2.cvtColor(difference, cv2.COLOR_BGR2GRAY)
+    changed = (difference > threshold).view(np.uint8)
+    height, width = changed.shape
+    rows, cols = -(-height // tile_size), -(-width // tile_size)
+    if (rows * tile_size, cols * tile_size) != changed.shape:
+        padded = np.zeros((rows * tile_size, cols * tile_size), dtype=np.uint8)
+        padded[:height, :width] = changed
+        changed = padded
+    # Summing the rows of each tile row first keeps the reductions over contiguous memory
+    counts = changed.reshape(rows, tile_size, -1).sum(axis=1, dtype=np.uint16)
+    return counts.reshape(rows, cols, tile_size).sum(axis=2) >= min_pixels
+
+
+def dirty_runs(grid):
+    """(row, first column, last column) of every run of neighbouring dirty tiles."""
+    for row in range(grid.shape[0]):
+        cols = np.flatnonzero(grid[row])
+        if cols.size:
+            for run in np.split(cols, np.flatnonzero(np.diff(cols) > 1) + 1):
+                yield row, run[0], run[-1]
+
+
+class TileProcessor:
+    """Run a plan only on the tiles of an image that changed since the last one.
+
+    The image is split into square tiles of ``tile_size`` pixels and
+    compared with the reference, the image the stage outputs were last
+    computed for. A change reaches as far as the plan's kernels into the
+    outputs, so runs of dirty tiles in a tile row are pasted into the kept
+    stage outputs with that halo around them, computed from an input that
+    reaches twice as far plus ``margin`` pixels. The rest of the outputs
+    stays as it is. When more than ``full_fraction`` of the tiles are dirty
+    the whole image is processed, that is cheaper.
+
+    Kernels only reach a few pixels, but Canny hysteresis follows weak
+    edges across any distance, so a tiled edge map can differ slightly
+    from a full one where an edge chain crosses the halo. Every
+    ``verify_interval`` tiled frames the plan also runs on the whole
+    image; the fraction of differing output pixels is kept in ``mismatch``
+    and the full result replaces the tiled one.
+    """
+
+    def __init__(self, tile_size=TILE_SIZE, threshold=TILE_THRESHOLD, min_pixels=TILE_MIN_PIXELS,
+                 margin=TILE_MARGIN, full_fraction=FULL_FRAME_FRACTION, verify_interval=VERIFY_INTERVAL):
+        self.tile_size = tile_size
+        self.threshold = threshold
+        self.min_pixels = min_pixels
+        self.margin = margin
+        self.full_fraction = full_fraction
+        self.verify_interval = verify_interval
+        self.dirty_fraction = 1.0
+        self.mismatch = None
+        self.checks = 0
+        self._tiled_frames = 0
+        self._key = None
+        self._reference = None
+        self._images = None
+
+    def process(self, image, plan, halo, timings=None):
+        """Return the outputs of every stage of ``plan`` for ``image``.
+
+        ``halo`` is how far the plan looks around a pixel. If ``timings``
+        is a list, (name, milliseconds) is appended for the tile comparison
+        and every stage.
+        """
+        key = ([stage.to_dict() for stage in plan], image.shape, image.dtype.str)
+        grid = None
+        if key == self._key:
+            start = time.perf_counter()
+            grid = dirty_tiles(image, self._reference, self.tile_size, self.threshold, self.min_pixels)
+            if timings is not None:
+                timings.append(("tiles", (time.perf_counter() - start) * 1000))
+            self.dirty_fraction = float(grid.mean())
+        else:
+            self.dirty_fraction = 1.0
+
+        if grid is None or self.dirty_fraction > self.full_fraction:
+            return self._run_full(image, plan, key, timings)
+
+        images = self._run_tiles(image, plan, grid, halo, timings)
+        self._tiled_frames += 1
+        if self.verify_interval and self._tiled_frames % self.verify_interval == 0:
+            tiled = images[-1]
+            images = self._run_full(image, plan, key)
+            self.mismatch = np.count_nonzero(tiled != images[-1]) / tiled.size
+            self.checks += 1
+        return images
+
+    def _run_full(self, image, plan, key, timings=None):
+        images = []
+        output = image
+        for stage in plan:
+            start = time.perf_counter()
+            output = stage.apply(output)
+            if timings is not None:
+                timings.append((stage.name, (time.perf_counter() - start) * 1000))
+            # Outputs are pasted into later on, they must not share memory with the input
+            images.append(output.copy() if np.may_share_memory(output, image) else output)
+        self._key = key
+        self._reference = image.copy()
+        self._images = images
+        return list(images)
+
+    def _run_tiles(self, image, plan, grid, halo, timings):
+        # The last output has been handed out, the others are only kept here
+        self._images[-1] = self._images[-1].copy()
+        images = self._images
+        stage_ms = [0.0] * len(plan)
+        size = self.tile_size
+        height, width = image.shape[:2]
+        reach = 2 * halo + self.margin
+        for row, first, last in dirty_runs(grid):
+            top, bottom = row * size, min(height, (row + 1) * size)
+            left, right = first * size, min(width, (last + 1) * size)
+            self._reference[top:bottom, left:right] = image[top:bottom, left:right]
+            # Outputs the change reaches, and the input they depend on
+            top, bottom = max(0, top - halo), min(height, bottom + halo)
+            left, right = max(0, left - halo), min(width, right + halo)
+            y, x = max(0, top - reach + halo), max(0, left - reach + halo)
+            region = image[y:min(height, bottom + reach - halo), x:min(width, right + reach - halo)]
+            for index, stage in enumerate(plan):
+                start = time.perf_counter()
+                region = stage.apply(region)
+                stage_ms[index] += (time.perf_counter() - start) * 1000
+                images[index][top:bottom, left:right] = region[top - y:bottom - y, left - x:right - x]
+        if timings is not None:
+            timings.extend((stage.name, ms) for stage, ms in zip(plan, stage_ms))
+        return list(images)
@@ -0,0 +1,113 @@
+from collections import namedtuple
+import os
+import re
+import struct
+import sys
+
+if sys.platform.startswith("linux"):
+    import fcntl
+
+V4L2_SYSFS_ROOT = "/sys/class/video4linux"
+DEV_ROOT = "/dev"
+
+# struct v4l2_capability from linux/videodev2.h: driver[16], card[32],
+# bus_info[32], version, capabilities, device_caps, reserved[3]
+CAPABILITY_STRUCT = struct.Struct("16s32s32sIII12x")
+VIDIOC_QUERYCAP = (2 << 30) | (CAPABILITY_STRUCT.size << 16) | (ord("V") << 8) | 0  # _IOR('V', 0, ...)
+
+CAP_VIDEO_CAPTURE = 0x00000001
+CAP_VIDEO_CAPTURE_MPLANE = 0x00001000
+CAP_DEVICE_CAPS = 0x80000000
+
+# Capabilities of one /dev/video node, ``capabilities`` are those of the node itself
+Capability = namedtuple("Capability", "driver card bus_info capabilities")
+
+# A /dev/video<index> node. ``bus_id`` names the physical device, e.g. the
+# USB port; nodes of the same camera share it. ``capture`` is None when the
+# node could not be queried.
+V4L2Device = namedtuple("V4L2Device", "index name bus_id path driver bus_info capture")
+
+
+def query_capability(path):
+    """Ask a device node for its capabilities with VIDIOC_QUERYCAP.
+
+    The node is only opened, no stream is set up and no frame is read.
+    Returns None if the node cannot be opened or queried.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+    except OSError:
+        return None
+    try:
+        buffer = bytearray(CAPABILITY_STRUCT.size)
+        fcntl.ioctl(fd, VIDIOC_QUERYCAP, buffer)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+    driver, card, bus_info, _, capabilities, device_caps = CAPABILITY_STRUCT.unpack(buffer)
+    if capabilities & CAP_DEVICE_CAPS:
+        # The capabilities of the whole device, the node may only offer part of them
+        capabilities = device_caps
+    return Capability(*(text.split(b"\0", 1)[0].decode(errors="replace") for text in (driver, card, bus_info)),
+                      capabilities)
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def list_v4l2_devices(sysfs_root=V4L2_SYSFS_ROOT, dev_root=DEV_ROOT, query=query_capability):
+    """List the video4linux nodes as V4L2Device tuples, ordered by index.
+
+    Names and bus IDs come from sysfs, whether a node captures video from
+    ``query``, VIDIOC_QUERYCAP by default. The roots and ``query`` can be
+    replaced to run against a fake sysfs tree.
+    """
+    try:
+        entries = os.listdir(sysfs_root)
+    except OSError:
+        return []
+
+    devices = []
+    for entry in entries:
+        match = re.fullmatch(r"video(\d+)", entry)
+        if not match:
+            continue
+        node = os.path.join(sysfs_root, entry)
+        name = _read(os.path.join(node, "name")) or entry
+        bus_id = os.path.basename(os.path.realpath(os.path.join(node, "device")))
+        path = os.path.join(dev_root, entry)
+
+        capability = query(path)
+        if capability is None:
+            capture, driver, bus_info = None, None, None
+        else:
+            capture = bool(capability.capabilities & (CAP_VIDEO_CAPTURE | CAP_VIDEO_CAPTURE_MPLANE))
+            driver, bus_info = capability.driver, capability.bus_info
+            name = capability.card or name
+        devices.append(V4L2Device(int(match.group(1)), name, bus_id, path, driver, bus_info, capture))
+    return sorted(devices)
+
+
+def list_v4l2_cameras(sysfs_root=V4L2_SYSFS_ROOT, dev_root=DEV_ROOT, query=query_capability):
+    """The nodes that capture video, see list_v4l2_devices().
+
+    Nodes that could not be queried, e.g. without access to /dev, are kept
+    if sysfs names them as the first node of their device; the others are
+    usually metadata nodes.
+    """
+    cameras = []
+    for device in list_v4l2_devices(sysfs_root, dev_root, query):
+        if device.capture is None:
+            if _read(os.path.join(sysfs_root, f"video{device.index}", "index")) not in (None, "0"):
+                continue
+        elif not device.capture:
+            continue
+        cameras.append(device)
+    return cameras
@@ -0,0 +1,154 @@
+from PyQt6.QtCore import Qt, QPoint, QRect, QSize, QTimer, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QColor, QFont, QPainter
+from PyQt6.QtWidgets import QRubberBand, QWidget
+
+import time
+
+from frame_display import FrameConverter, GridCompositor, fit_rect
+
+DISPLAY_FPS = 60  # Highest rate the video is repainted at, whatever the cameras deliver
+
+
+class VideoWidget(QWidget):
+    """Paint the frames of one or more cameras, as a grid for several.
+
+    Frame notifications go to schedule(), which emits ``frame_requested``
+    at most ``max_fps`` times per second however many notifications came
+    in; the owner then hands the newest frames over with set_frames(). Only
+    the cells of changed frames are invalidated, and frames are scaled and
+    converted in paintEvent(), so a frame replaced before the next paint is
+    never converted. With ``smooth`` off frames are scaled to the nearest
+    pixel, which is cheaper.
+
+    Dragging a rectangle over the video emits ``region_selected`` with it
+    in widget coordinates. ``frames_painted`` reports the milliseconds spent
+    converting and drawing each new frame, as a {position: ms} dict.
+    """
+
+    frame_requested = pyqtSignal()
+    region_selected = pyqtSignal(QRect)
+    frames_painted = pyqtSignal(object)
+
+    def __init__(self, parent=None, max_fps=DISPLAY_FPS, smooth=True):
+        super().__init__(parent)
+        self.max_fps = max_fps
+        self.smooth = smooth
+        self.placeholder = ""
+        self._frames = []
+        self._images = {}
+        self._converters = {}
+        self._scheduled = False
+        self._last_request = 0.0
+        self._drag_origin = None
+        self._band = QRubberBand(QRubberBand.Shape.Rectangle, self)
+        # Every pixel is painted in paintEvent, Qt need not clear the background first
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.setFont(QFont("Arial", 14))
+
+    def sizeHint(self):
+        return QSize(640, 480)
+
+    @pyqtSlot()
+    def schedule(self):
+        """Ask for new frames, notifications are coalesced to ``max_fps``."""
+        if self._scheduled:
+            return
+        self._scheduled = True
+        delay = 1 / self.max_fps - (time.perf_counter() - self._last_request)
+        QTimer.singleShot(max(0, int(delay * 1000)), self._request)
+
+    def _request(self):
+        self._scheduled = False
+        self._last_request = time.perf_counter()
+        self.frame_requested.emit()
+
+    def set_frames(self, frames, changed=None):
+        """Show ``frames``, None for an empty cell; ``changed`` lists new positions, None all."""
+        if len(frames) != len(self._frames):
+            # The grid changed, every cell moves
+            changed = None
+            self._converters.clear()
+        self._frames = list(frames)
+        if changed is None:
+            self._images.clear()
+            self.update()
+            return
+        cells = self.cells()
+        for position in changed:
+            self._images.pop(position, None)
+            self.update(QRect(*cells[position]))
+
+    def clear(self, placeholder=""):
+        """Remove all frames and show ``placeholder`` instead."""
+        self.placeholder = placeholder
+        self._frames = []
+        self._images.clear()
+        self._converters.clear()
+        self.update()
+
+    def set_smooth(self, smooth):
+        self.smooth = smooth
+        self._images.clear()
+        self.update()
+
+    def cells(self):
+        """The (x, y, width, height) cell of every frame position."""
+        if len(self._frames) <= 1:
+            return [(0, 0, self.width(), self.height())]
+        return GridCompositor.cells(len(self._frames), (self.width(), self.height()))
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), QColor(Qt.GlobalColor.black))
+        if not self._frames:
+            painter.setPen(QColor(Qt.GlobalColor.white))
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, self.placeholder)
+            return
+
+        painted = {}
+        for position, (frame, cell) in enumerate(zip(self._frames, self.cells())):
+            if frame is None or not event.rect().intersects(QRect(*cell)):
+                continue
+            start = time.perf_counter()
+            image = self._images.get(position)
+            new = image is None
+            if new:
+                converter = self._converters.setdefault(position, FrameConverter())
+                # Shares the converter's buffer, valid until the position is converted again
+                image = converter.to_qimage(frame, cell[2:], self.smooth)
+                self._images[position] = image
+            x, y, _, _ = fit_rect((frame.shape[1], frame.shape[0]), cell)
+            painter.drawImage(QPoint(x, y), image)
+            if new:
+                painted[position] = (time.perf_counter() - start) * 1000
+        painter.end()
+        if painted:
+            self.frames_painted.emit(painted)
+
+    def resizeEvent(self, event):
+        # The whole widget is repainted after a resize, at the new size
+        self._images.clear()
+        super().resizeEvent(event)
+
+    def mousePressEvent(self, event):
+        if self._frames and event.button() == Qt.MouseButton.LeftButton:
+            self._drag_origin = event.position().toPoint()
+            self._band.setGeometry(QRect(self._drag_origin, QSize()))
+            self._band.show()
+        else:
+            super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._drag_origin is not None:
+            self._band.setGeometry(QRect(self._drag_origin, event.position().toPoint()).normalized())
+        else:
+            super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if self._drag_origin is not None:
+            self._band.hide()
+            rect = QRect(self._drag_origin, event.position().toPoint()).normalized()
+            self._drag_origin = None
+            self.region_selected.emit(rect)
+        else:
+            super().mouseReleaseEvent(event)
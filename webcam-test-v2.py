@@ -1,69 +1,97 @@
-from PyQt6.QtCore import Qt, pyqtSlot, QTimer
-from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QLabel, QComboBox, QPushButton, QWidget, QHBoxLayout, QGroupBox,QTextEdit,QStatusBar, QSizePolicy
-from PyQt6.QtGui import QImage, QPixmap, QFont
+import time
+LAUNCH_TIME = time.perf_counter()  # Startup times are measured from here
+
+from PyQt6.QtCore import Qt, pyqtSlot, QTimer, QRect, QEvent
+from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QLabel, QComboBox, QPushButton, QWidget, QHBoxLayout, QGroupBox,QPlainTextEdit,QStatusBar, QCheckBox, QListWidget, QAbstractItemView, QSlider, QGridLayout, QScrollArea, QDoubleSpinBox
 
 
+import argparse
+import os
 import sys
-import wmi
-import cv2
-import time
-from datetime import datetime
 
-def list_camera_devices_wmi():
-        c = wmi.WMI()
-        wmi_devices = c.Win32_PnPEntity(PNPClass="Camera")
-        
-        print(f"Found {len(wmi_devices)} imaging devices via WMI:")
-        for i, device in enumerate(wmi_devices):
-            print(f"Device {i}: {device.Name}")
+from camera_discovery import DiscoveryWorker, CameraDevice
+from camera_properties import PROPERTIES, POLL_INTERVAL
+from camera_session import CameraSession
+from change_detector import ChangeDetector, CHANGE_THRESHOLD, CHANGE_AREA
+from capture_modes import apply_mode, prepare_mode, parse_target
+from device_inventory import DeviceInventory, is_device, SOURCE_PREFIX
+from event_log import EventLog, format_event, EVENT_CAPACITY, LOG_MAX_BYTES, LOG_BACKUPS
+from frame_display import fit_rect
+from frame_pipeline import Pipeline, AdaptiveLevel, GaussianBlur, Canny, DEFAULT_PIPELINE
+from frame_scheduler import FrameScheduler, SCHEDULE_POLICIES, QUEUE_SIZE
+from frame_sources import DeviceSource, open_source
+from lazy_import import lazy_import, load
+from recorder import Recorder, OVERFLOW_POLICIES
+from status_panel import StatusPanel
+from ring_buffer import PreTriggerRecorder, RAM_BUDGET
+from telemetry import MetricsExporter
+from video_widget import VideoWidget, DISPLAY_FPS
 
-        available_cameras = []
-        max_to_check = 10  # Check reasonable number of indices
-        
-        for i in range(max_to_check):
-            cap = cv2.VideoCapture(i, cv2.CAP_DSHOW)
-            if cap.isOpened():
-                ret, frame = cap.read()
-                if ret:
-                    print(f"\nOpenCV camera at index {i} is working")
-                    if i < len(wmi_devices):
-                        available_cameras.append((i, wmi_devices[i].Name))
-                    else:
-                        available_cameras.append((i, f"Unknown Camera {i}"))
-                cap.release()
-        
-        return available_cameras
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+MIN_ROI_SIZE = 16      # Smallest region of interest side in frame pixels
+PARAM_DEBOUNCE_MS = 150  # Slider changes are applied once the slider rests this long
+SCALING_MODES = ("smooth", "fast")
+LOG_FLUSH_MS = 250       # New events reach the log view in batches at this interval
 
 class WebcamTest(QMainWindow):
      
-    def __init__(self):
+    def __init__(self, pipeline=None, workers=0, metrics_exporter=None, source_specs=None, replay_speed=1.0,
+                 loop=False, capture_target=None, record_options=None, trigger_options=None, adaptive=False,
+                 frame_budget_ms=None, schedule_options=None, property_interval=POLL_INTERVAL, event_log=None,
+                 change_options=None, display_options=None):
         super().__init__()
 
         self.setWindowTitle("Webcam Test")
         self.setGeometry(100, 100, 1000, 700)
         
         # Initialize variables
-        self.cap = None
-        self.current_camera_index = None
-        self.frame_count =0
-        self.start_time = 0
-        self.fps = 0
-        self.resolution = (0,0)
+        self.sessions = []
+        self.discovery_worker = None
+        self.cameras = []
+        self.validated_cameras = set()
+        self.inventory = DeviceInventory()
+        self.metrics_exporter = metrics_exporter
+        self.pipeline = pipeline or Pipeline.from_dict(DEFAULT_PIPELINE)
+        self.workers = workers
+        self.source_specs = source_specs or []
+        self.replay_speed = replay_speed
+        self.loop = loop
+        self.capture_target = capture_target
+        self.record_options = record_options or {}
+        self.trigger_options = trigger_options or {}
+        self.adaptive = adaptive
+        self.frame_budget_ms = frame_budget_ms
+        self.schedule_options = schedule_options or {}
+        self.property_interval = property_interval
+        self.event_log = event_log or EventLog()
+        self.change_options = change_options or {}
+        self.display_options = display_options or {}
+        self.startup_ms = {}  # Milliseconds from launch to the first paint, loaded modules and first frame
+        self.discovery_started = False
 
         # Create the main layout
         self.setup_ui()
 
-        # Timer for video updates
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_frame)
-        
         # Timer for status updates
         self.status_timer = QTimer(self)
         self.status_timer.timeout.connect(self.update_status)
         self.status_timer.start(1000)  # Update status once per second
 
-        # Load available cameras
-        self.load_cameras()
+        # New events are appended to the log view in batches
+        self.log_timer = QTimer(self)
+        self.log_timer.timeout.connect(self.flush_log)
+        self.log_timer.start(LOG_FLUSH_MS)
+
+        # Show the cached cameras right away; they are revalidated in the
+        # background once the window has been painted
+        self.load_cached_cameras()
+        if not self.cameras:
+            self.camera_list.addItem("Scanning for cameras...")
+        self.video_frame.installEventFilter(self)
+        # In case the window is not painted, e.g. when it starts minimized
+        QTimer.singleShot(1000, self.start_discovery)
 
 
     def setup_ui(self):
@@ -84,14 +112,13 @@ class WebcamTest(QMainWindow):
         controls_group = QGroupBox("Camera Controls")
         controls_layout = QVBoxLayout(controls_group)
 
-        # Camera selector
-        selector_layout = QHBoxLayout()
-        selector_label = QLabel("Camera:")
-        self.camera_combo = QComboBox()
-        self.camera_combo.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
-        selector_layout.addWidget(selector_label)
-        selector_layout.addWidget(self.camera_combo)
-        controls_layout.addLayout(selector_layout)
+        # Camera selector, Ctrl or Shift click to run several cameras at once
+        selector_label = QLabel("Cameras:")
+        self.camera_list = QListWidget()
+        self.camera_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.camera_list.setMaximumHeight(100)
+        controls_layout.addWidget(selector_label)
+        controls_layout.addWidget(self.camera_list)
 
         left_layout.addWidget(controls_group)
 
@@ -110,17 +137,140 @@ class WebcamTest(QMainWindow):
         button_layout.addWidget(self.refresh_button)
         controls_layout.addLayout(button_layout)
 
+        # Recording, of the raw camera stream or of the processed view
+        record_layout = QHBoxLayout()
+        self.record_button = QPushButton("Record")
+        self.record_button.setCheckable(True)
+        self.record_button.setEnabled(False)
+        self.record_button.toggled.connect(self.toggle_recording)
+        self.record_stream_combo = QComboBox()
+        self.record_stream_combo.addItems(["raw", "processed"])
+        record_layout.addWidget(self.record_button)
+        record_layout.addWidget(self.record_stream_combo)
+        controls_layout.addLayout(record_layout)
+
+        # Trigger, saves the buffered seconds before it and the seconds after it
+        self.trigger_button = QPushButton("Trigger")
+        self.trigger_button.setEnabled(False)
+        self.trigger_button.clicked.connect(self.trigger)
+        controls_layout.addWidget(self.trigger_button)
+
+        # Quick scan only opens each index instead of reading a frame
+        self.quick_scan_check = QCheckBox("Quick scan (open only)")
+        controls_layout.addWidget(self.quick_scan_check)
+
+        # Processing load: drag on the video to process only a region,
+        # adaptive resolution drops pyramid levels when processing falls behind
+        load_layout = QHBoxLayout()
+        self.adaptive_check = QCheckBox("Adaptive resolution")
+        self.adaptive_check.setChecked(self.adaptive)
+        self.adaptive_check.toggled.connect(self.set_adaptive)
+        self.reset_roi_button = QPushButton("Reset ROI")
+        self.reset_roi_button.clicked.connect(self.reset_roi)
+        self.unchanged_check = QCheckBox("Skip unchanged frames")
+        self.unchanged_check.setChecked(self.change_options.get("enabled", False))
+        self.unchanged_check.toggled.connect(self.set_skip_unchanged)
+        load_layout.addWidget(self.adaptive_check)
+        load_layout.addWidget(self.unchanged_check)
+        load_layout.addWidget(self.reset_roi_button)
+        controls_layout.addLayout(load_layout)
+
+        # View selector, picks which pipeline stage output is displayed
+        view_layout = QHBoxLayout()
+        view_label = QLabel("View:")
+        self.view_combo = QComboBox()
+        self.view_combo.addItems(self.pipeline.views())
+        self.view_combo.setCurrentText(self.pipeline.display)
+        self.view_combo.currentTextChanged.connect(self.change_view)
+        view_layout.addWidget(view_label)
+        view_layout.addWidget(self.view_combo)
+        # Scaling of the displayed frames, fast takes the nearest pixel
+        self.scaling_combo = QComboBox()
+        self.scaling_combo.addItems(SCALING_MODES)
+        self.scaling_combo.setCurrentText("smooth" if self.display_options.get("smooth", True) else "fast")
+        self.scaling_combo.currentTextChanged.connect(self.change_scaling)
+        view_layout.addWidget(self.scaling_combo)
+        controls_layout.addLayout(view_layout)
+
+        # Scheduling, which captured frames get processed
+        schedule_layout = QHBoxLayout()
+        schedule_label = QLabel("Schedule:")
+        self.schedule_combo = QComboBox()
+        self.schedule_combo.addItems(SCHEDULE_POLICIES)
+        self.schedule_combo.setCurrentText(self.schedule_options.get("policy", "latest"))
+        self.schedule_combo.currentTextChanged.connect(self.change_schedule)
+        schedule_layout.addWidget(schedule_label)
+        schedule_layout.addWidget(self.schedule_combo)
+        controls_layout.addLayout(schedule_layout)
+
         left_layout.addWidget(controls_group)
 
+        # Parameters group, live tuning of the first blur and Canny stages
+        params_group = QGroupBox("Parameters")
+        params_layout = QGridLayout(params_group)
+        self.pause_button = QPushButton("Pause")
+        self.pause_button.setCheckable(True)
+        self.pause_button.setEnabled(False)
+        self.pause_button.toggled.connect(self.toggle_pause)
+        params_layout.addWidget(self.pause_button, 0, 0, 1, 3)
+
+        self.blur_stage = next((stage.name for stage in self.pipeline.stages if isinstance(stage, GaussianBlur)), None)
+        self.canny_stage = next((stage.name for stage in self.pipeline.stages if isinstance(stage, Canny)), None)
+        blur = self.pipeline.stage(self.blur_stage) if self.blur_stage else GaussianBlur()
+        canny = self.pipeline.stage(self.canny_stage) if self.canny_stage else Canny()
+        self.param_sliders = {}
+        # Kernel sizes and apertures must be odd, their sliders step through 2 * value + 1
+        for row, (key, label, minimum, maximum, value, odd, stage) in enumerate([
+                ("low", "Canny low", 0, 500, canny.low, False, self.canny_stage),
+                ("high", "Canny high", 0, 500, canny.high, False, self.canny_stage),
+                ("aperture", "Aperture", 1, 3, (canny.aperture - 1) // 2, True, self.canny_stage),
+                ("ksize", "Blur kernel", 0, 15, (blur.ksize - 1) // 2, True, self.blur_stage)], start=1):
+            slider = QSlider(Qt.Orientation.Horizontal)
+            slider.setRange(minimum, maximum)
+            slider.setValue(int(value))
+            slider.setEnabled(stage is not None)
+            value_label = QLabel()
+            slider.valueChanged.connect(
+                lambda v, value_label=value_label, odd=odd: self.on_param_changed(value_label, 2 * v + 1 if odd else v))
+            value_label.setText(str(2 * slider.value() + 1 if odd else slider.value()))
+            params_layout.addWidget(QLabel(f"{label}:"), row, 0)
+            params_layout.addWidget(slider, row, 1)
+            params_layout.addWidget(value_label, row, 2)
+            self.param_sliders[key] = slider
+
+        # Apply slider changes once they come to rest
+        self.param_timer = QTimer(self)
+        self.param_timer.setSingleShot(True)
+        self.param_timer.setInterval(PARAM_DEBOUNCE_MS)
+        self.param_timer.timeout.connect(self.apply_params)
+
+        left_layout.addWidget(params_group)
+
+        # Camera properties, written to all cameras from their capture threads
+        properties_group = QGroupBox("Camera Properties")
+        properties_layout = QGridLayout(properties_group)
+        self.property_spins = {}
+        for row, name in enumerate(PROPERTIES):
+            spin = QDoubleSpinBox()
+            spin.setRange(-100000, 100000)
+            spin.setDecimals(1)
+            spin.valueChanged.connect(lambda value, name=name: self.set_camera_property(name, value))
+            properties_layout.addWidget(QLabel(f"{name.capitalize()}:"), row, 0)
+            properties_layout.addWidget(spin, row, 1)
+            self.property_spins[name] = spin
+        left_layout.addWidget(properties_group)
+
         # Status information group
         status_group=QGroupBox("Camera Status")
         status_layout = QVBoxLayout(status_group)
 
-        # Status text display
-        self.status_text = QTextEdit()
-        self.status_text.setReadOnly(True)
-        self.status_text.setMinimumHeight(200)
-        status_layout.addWidget(self.status_text)
+        # Status fields, each one only redrawn when its text changes
+        self.status_panel = StatusPanel()
+        status_scroll = QScrollArea()
+        status_scroll.setWidgetResizable(True)
+        status_scroll.setMinimumHeight(200)
+        status_scroll.setWidget(self.status_panel)
+        status_layout.addWidget(status_scroll)
 
         left_layout.addWidget(status_group)
 
@@ -128,9 +278,10 @@ class WebcamTest(QMainWindow):
         log_group = QGroupBox("Event Log")
         log_layout = QVBoxLayout(log_group)
 
-        # Log text display
-        self.log_text = QTextEdit()
+        # Log text display, the oldest lines are dropped beyond the event log capacity
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
+        self.log_text.setMaximumBlockCount(self.event_log.capacity)
         log_layout.addWidget(self.log_text)
 
         left_layout.addWidget(log_group)
@@ -139,13 +290,14 @@ class WebcamTest(QMainWindow):
         right_panel = QWidget()
         right_layout = QVBoxLayout(right_panel)
 
-        # Video frame
-        self.video_frame = QLabel()
-        self.video_frame.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        # Video frame, painted directly and at most at the display rate
+        self.video_frame = VideoWidget(max_fps=self.display_options.get("max_fps", DISPLAY_FPS),
+                                       smooth=self.display_options.get("smooth", True))
         self.video_frame.setMinimumSize(640, 480)
-        self.video_frame.setStyleSheet("background-color: black;")
-        self.video_frame.setText("No Camera Feed")
-        self.video_frame.setFont(QFont("Arial",14))
+        self.video_frame.clear("No Camera Feed")
+        self.video_frame.frame_requested.connect(self.update_frame)
+        self.video_frame.frames_painted.connect(self.on_frames_painted)
+        self.video_frame.region_selected.connect(self.select_roi)
 
         # Add video frame to right panel
         right_layout.addWidget(self.video_frame)
@@ -159,179 +311,815 @@ class WebcamTest(QMainWindow):
         self.setStatusBar(self.statusBar)
         self.statusBar.showMessage("Ready")
 
+    def load_cached_cameras(self):
+        """Fill the camera list from the device inventory cache."""
+        for camera in self.inventory.cameras():
+            self.add_camera_entry(camera)
+        if self.cameras:
+            self.log_message(f"Loaded {len(self.cameras)} camera(s) from cache")
+        self.update_status_info()
+
+    def eventFilter(self, watched, event):
+        """Start discovery once the video area has been painted for the first time"""
+        if watched is self.video_frame and event.type() == QEvent.Type.Paint:
+            self.video_frame.removeEventFilter(self)
+            self.startup_ms["first_paint"] = (time.perf_counter() - LAUNCH_TIME) * 1000
+            self.log_message(f"Window painted {self.startup_ms['first_paint']:.0f} ms after launch", kind="startup",
+                             first_paint_ms=self.startup_ms["first_paint"])
+            QTimer.singleShot(0, self.start_discovery)
+        return super().eventFilter(watched, event)
+
+    @pyqtSlot()
+    def start_discovery(self):
+        """Load OpenCV and NumPy, then look for cameras in the background"""
+        if self.discovery_started:
+            return
+        self.discovery_started = True
+        # Loaded here on the GUI thread, before any other thread can use them
+        start = time.perf_counter()
+        load(cv2, np)
+        self.startup_ms["modules"] = (time.perf_counter() - LAUNCH_TIME) * 1000
+        self.log_message(f"OpenCV and NumPy loaded in {(time.perf_counter() - start) * 1000:.0f} ms",
+                         kind="startup", modules_ms=self.startup_ms["modules"])
+        self.load_cameras()
+
     def load_cameras(self):
-        """Load available cameras into the combo box."""
-        self.camera_combo.clear()
-        
-        self.cameras = list_camera_devices_wmi()
+        """Revalidate the available cameras in the background."""
+        if self.discovery_worker and self.discovery_worker.isRunning():
+            return
+
+        self.validated_cameras = set()
+        self.refresh_button.setEnabled(False)
+        self.statusBar.showMessage("Scanning for cameras...")
+        if not self.cameras:
+            self.camera_list.clear()
+            self.camera_list.addItem("Scanning for cameras...")
+
+        self.discovery_worker = DiscoveryWorker(self.quick_scan_check.isChecked(), self)
+        self.discovery_worker.camera_found.connect(self.on_camera_found)
+        self.discovery_worker.discovery_finished.connect(self.on_discovery_finished)
+        self.discovery_worker.start()
+
+    @pyqtSlot(object)
+    def on_camera_found(self, camera):
+        """Confirm a camera as soon as discovery reports it."""
+        self.validated_cameras.add(camera.device_id)
+        self.add_camera_entry(camera)
+        self.update_status_info()
+
+    def add_camera_entry(self, camera):
+        """Add a camera to the camera list, or update its entry if it changed."""
+        # Drop the "No cameras found" placeholder
+        if not self.cameras:
+            self.camera_list.clear()
+
+        for position, known in enumerate(self.cameras):
+            if known.device_id == camera.device_id:
+                if known == camera:
+                    return
+                self.remove_camera_entry(position)
+                break
+
+        # Keep the entries ordered by index, results arrive out of order
+        position = 0
+        while position < len(self.cameras) and self.cameras[position].index < camera.index:
+            position += 1
+        self.cameras.insert(position, camera)
+        self.camera_list.insertItem(position, f"{camera.name} (Index: {camera.index})")
+        if not self.camera_list.selectedItems():
+            self.camera_list.setCurrentRow(0)
+
+    def remove_camera_entry(self, position):
+        """Remove a camera from the camera list."""
+        del self.cameras[position]
+        self.camera_list.takeItem(position)
+
+    @pyqtSlot(list)
+    def on_discovery_finished(self, cameras):
+        """Drop cached cameras that were not confirmed and update the cache."""
+        running = [session.camera for session in self.sessions]
+        for position in reversed(range(len(self.cameras))):
+            camera = self.cameras[position]
+            # Running cameras may not answer the probe while they are in use
+            if camera.device_id not in self.validated_cameras and camera not in running:
+                self.remove_camera_entry(position)
+
+        # Running devices are kept in the cache, frame sources never enter it
+        cameras = cameras + [camera for camera in running
+                             if is_device(camera) and camera.device_id not in self.validated_cameras]
+        added, changed, removed = self.inventory.update(cameras)
+        if added or changed or removed:
+            self.log_message(f"Camera list changed: {len(added)} added, {len(changed)} changed, "
+                             f"{len(removed)} removed", kind="discovery",
+                             added=len(added), changed=len(changed), removed=len(removed))
+        self.save_inventory()
+
         if self.cameras:
-            for index, name in self.cameras:
-                self.camera_combo.addItem(f"{name} (Index: {index})", index)
             self.log_message(f"Found {len(self.cameras)} camera(s)")
-            # TODO self.start_button.setEnabled(True)
         else:
-            self.camera_combo.addItem("No cameras found")
+            self.camera_list.clear()
+            self.camera_list.addItem("No cameras found")
             self.log_message("No cameras found")
-            # TODO self.start_button.setEnabled(True)
 
+        if not self.sessions:
+            self.refresh_button.setEnabled(True)
+        self.statusBar.showMessage("Ready")
         self.update_status_info()
 
+    def selected_cameras(self):
+        """The cameras selected in the list, or the frame sources given on the command line"""
+        if self.source_specs:
+            return [CameraDevice(None, spec, SOURCE_PREFIX + spec) for spec in self.source_specs]
+        rows = sorted(index.row() for index in self.camera_list.selectedIndexes())
+        return [self.cameras[row] for row in rows if row < len(self.cameras)]
+
     def start_camera(self):
-        """Start the selected camera."""
-        selected_index = self.camera_combo.currentIndex()
-        if selected_index >= 0:
-            camera_index = self.camera_combo.itemData(selected_index)
-            camera_name = self.camera_combo.currentText().split(" (Index:")[0]
+        """Start the selected cameras side by side, each on its own workers"""
+        cameras = self.selected_cameras()
+        if not cameras:
+            self.log_message("No camera selected")
+            return
 
         self.stop_camera()
 
-        self.cap= cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
-        if self.cap.isOpened():
-            # Get camera properties
-            width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            self.resolution = (width, height)
-
-            # Start capturing frames
-            self.current_camera_index = camera_index
-            self.frame_count = 0
-            self.start_time = time.time()
-            self.timer.start(30)  # ~33 fps
-
-            # Update UI
-            self.start_button.setEnabled(False)
-            self.stop_button.setEnabled(True)
-            self.camera_combo.setEnabled(False)
-            self.refresh_button.setEnabled(False)
-
-            # Log the action
-            self.log_message(f"Started camera: {camera_name} (Index: {camera_index})")
-            self.statusBar.showMessage(f"Camera started: {camera_name}")
+        for camera in cameras:
+            session = self.open_session(camera)
+            if session:
+                self.sessions.append(session)
+        if not self.sessions:
+            self.statusBar.showMessage("Failed to open camera")
+            return
+        for session in self.sessions:
+            session.start()
+
+        # Update UI
+        self.start_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+        self.camera_list.setEnabled(False)
+        self.refresh_button.setEnabled(False)
+        self.record_button.setEnabled(True)
+        self.pause_button.setEnabled(True)
+        self.trigger_button.setEnabled(any(session.pre_trigger for session in self.sessions))
+        self.statusBar.showMessage(f"Camera started: {', '.join(session.name for session in self.sessions)}")
+
+    def open_session(self, camera):
+        """Open one camera and set up its workers, returns None if it cannot be opened"""
+        if camera.index is None:
+            try:
+                cap = open_source(camera.name, self.replay_speed, self.loop)
+            except (OSError, ValueError) as error:
+                self.log_message(f"Failed to open {camera.name}: {error}", "error", "camera")
+                return None
+        else:
+            cap = DeviceSource(camera.index)
+        if not cap.isOpened():
+            self.log_message(f"Failed to open camera: {camera.name} (Index: {camera.index})", "error", "camera",
+                             camera=camera.index)
+            return None
+
+        # Live devices switch to the best mode for the capture target, otherwise
+        # reopen in the last known working mode; both on the capture thread
+        prepare = None
+        if self.capture_target and isinstance(cap, DeviceSource):
+            target = self.capture_target
+            cached = self.inventory.negotiated_mode(camera.device_id, target)
+            prepare = lambda cap: prepare_mode(cap, target, cached)
+            if cached is None:
+                self.statusBar.showMessage(f"Negotiating capture mode for {camera.name}...")
         else:
-            self.log_message(f"Failed to open camera: {camera_name} (Index: {camera_index})")
-            self.statusBar.showMessage(f"Failed to open camera: {camera_name}")
+            mode = self.inventory.capture_mode(camera.device_id)
+            if mode:
+                prepare = lambda cap: apply_mode(cap, mode)
+
+        policy = self.schedule_combo.currentText()
+        if policy == "latest" and isinstance(cap, DeviceSource):
+            # Also keep stale frames from queueing up in the driver, where supported
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        scheduler = FrameScheduler(policy, self.schedule_options.get("n", 2),
+                                   self.schedule_options.get("queue_size", QUEUE_SIZE))
+
+        label = f"cam{camera.index}" if camera.index is not None else f"source{len(self.sessions)}"
+        # Every camera gets its own copy of the pipeline, stages are not shared between threads
+        session = CameraSession(camera, cap, Pipeline.from_dict(self.pipeline.to_dict()), self.workers,
+                                prepare, label, scheduler, self.property_interval, self)
+        session.capture_worker.capture_prepared.connect(
+            lambda result, session=session: self.on_capture_prepared(session, result))
+        session.capture_worker.capture_failed.connect(
+            lambda message, session=session: self.on_capture_failed(session, message))
+        session.capture_worker.capture_ended.connect(lambda session=session: self.on_capture_ended(session))
+        session.pipeline_worker.processing_failed.connect(
+            lambda message, session=session: self.on_capture_failed(session, message))
+        session.pipeline_worker.frame_processed.connect(self.video_frame.schedule)
+        session.capture_worker.properties_changed.connect(
+            lambda changes, session=session: self.on_properties_changed(session, changes))
+        # Sized for the default frame rate until the capture worker reports the mode
+        if self.adaptive:
+            session.pipeline_worker.adaptive = AdaptiveLevel(self.frame_budget(None), self.pipeline.level)
+        if self.unchanged_check.isChecked():
+            session.pipeline_worker.change_detector = self.change_detector()
+        self.start_pre_trigger(session, None)
+
+        self.log_message(f"Started camera: {camera.name} (Index: {camera.index})", kind="camera", camera=camera.index)
+        return session
 
     def stop_camera(self):
-        """Stop the current camera"""
-        if self.cap and self.cap.isOpened():
-            self.timer.stop()
-            self.cap.release()
-            self.cap = None
-            self.current_camera_index = None
-            
-            # Update UI
-            self.video_frame.setText("No Camera Feed")
-            self.start_button.setEnabled(True)
-            self.stop_button.setEnabled(False)
-            self.camera_combo.setEnabled(True)
-            self.refresh_button.setEnabled(True)
-            
-            # Log the action
-            self.log_message("Camera stopped")
-            self.statusBar.showMessage("Camera stopped")
-            
-            # Clear fps counter
-            self.frame_count = 0
-            self.fps = 0
-            self.update_status_info()
+        """Stop all running cameras"""
+        if not self.sessions:
+            return
+        self.record_button.setChecked(False)
+        self.record_button.setEnabled(False)
+        self.trigger_button.setEnabled(False)
+        self.pause_button.setChecked(False)
+        self.pause_button.setEnabled(False)
+        for session in list(self.sessions):
+            self.close_session(session)
+
+        # Update UI
+        self.video_frame.clear("No Camera Feed")
+        self.start_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
+        self.camera_list.setEnabled(True)
+        self.refresh_button.setEnabled(True)
+
+        # Log the action
+        self.log_message("Camera stopped")
+        self.statusBar.showMessage("Camera stopped")
+        self.update_status_info()
 
+    def close_session(self, session):
+        """Stop one camera, the others keep running"""
+        self.detach_recorder(session)
+        self.stop_pre_trigger(session)
+        session.stop()
+        self.sessions.remove(session)
 
     @pyqtSlot()
     def update_frame(self):
-        """Update the video frame"""
-        if self.cap and self.cap.isOpened():
-            ret, frame = self.cap.read()
-            if ret:
-                # Count frames for FPS calculation
-                self.frame_count += 1
-                elapsed_time = time.time() - self.start_time
-                if elapsed_time > 0:
-                    self.fps = self.frame_count / elapsed_time
-                
-                # Convert frame to format suitable for Qt
-                rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb_image.shape
-                bytes_per_line = ch * w
-                
-                # Convert to QImage and then to QPixmap
-                qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-                
-                # Scale the image to fit the label while maintaining aspect ratio
-                pixmap = QPixmap.fromImage(qt_image)
-                scaled_pixmap = pixmap.scaled(self.video_frame.size(), 
-                                             Qt.AspectRatioMode.KeepAspectRatio, 
-                                             Qt.TransformationMode.SmoothTransformation)
-                
-                self.video_frame.setPixmap(scaled_pixmap)
+        """Take the newest frame of every camera and repaint the cells that changed"""
+        changed = set()
+        now = time.time()
+        for position, session in enumerate(self.sessions):
+            seq = session.latest()
+            if seq is None:
+                continue
+            changed.add(position)
+            if session.frame_count == 1:
+                self.remember_capture_mode(session)
+                self.log_first_frame(session)
+            session.telemetry.record_display(seq)
+            # Age of the frame when it is shown, from capture to display
+            session.telemetry.record_stage("age", (now - session.last_timestamp) * 1000)
+
+        if changed:
+            self.show_frames(changed)
+
+    def log_first_frame(self, session):
+        """Report how long a camera took to show its first frame"""
+        start_ms = (time.time() - session.start_time) * 1000
+        if "first_frame" not in self.startup_ms:
+            self.startup_ms["first_frame"] = (time.perf_counter() - LAUNCH_TIME) * 1000
+        self.log_message(f"First frame of {session.name} after {start_ms:.0f} ms", kind="startup",
+                         camera=session.camera.index, first_frame_ms=start_ms)
+
+    def show_frames(self, changed=None):
+        """Hand the last frames to the video widget, it repaints the changed cells"""
+        self.video_frame.set_frames([session.last_frame for session in self.sessions], changed)
+
+    def on_frames_painted(self, display_ms):
+        """Record the time the video widget spent converting and drawing the new frame of each camera"""
+        for position, ms in display_ms.items():
+            if position < len(self.sessions):
+                self.sessions[position].telemetry.record_stage("display", ms)
+
+    @pyqtSlot(bool)
+    def toggle_recording(self, checked):
+        """Start or stop recording the selected stream"""
+        if checked:
+            self.start_recording()
+        else:
+            self.stop_recording()
+
+    def start_recording(self):
+        """Record the raw or processed stream of every camera on its own encoder thread"""
+        stream = self.record_stream_combo.currentText()
+        for session in self.sessions:
+            fps = session.fps or 30.0
+            session.recorder = Recorder(self.record_options.get("directory", "recordings"),
+                                        prefix=f"{stream}_{session.label}", fps=fps,
+                                        **{k: v for k, v in self.record_options.items() if k != "directory"})
+            session.recorder.start()
+            if stream == "raw":
+                session.capture_worker.recorder = session.recorder
             else:
-                self.log_message("Error reading from camera")
-                self.stop_camera()
-    
+                session.pipeline_worker.recorder = session.recorder
+        self.record_stream_combo.setEnabled(False)
+        self.log_message(f"Recording {stream} stream of {len(self.sessions)} camera(s) to "
+                         f"{self.record_options.get('directory', 'recordings')}")
+
+    def stop_recording(self):
+        """Detach the recorders and let them encode the frames still queued"""
+        for session in self.sessions:
+            self.detach_recorder(session)
+        self.record_stream_combo.setEnabled(True)
+
+    def detach_recorder(self, session):
+        if not session.recorder:
+            return
+        session.capture_worker.recorder = None
+        session.pipeline_worker.recorder = None
+        recorder, session.recorder = session.recorder, None
+        recorder.stop()
+
+        if recorder.error:
+            self.log_message(f"Recording of {session.name} failed: {recorder.error}", "error", "recording",
+                             camera=session.camera.index)
+        self.log_message(f"Recording of {session.name} stopped: {recorder.frames_written} frame(s) in "
+                         f"{len(recorder.segments)} file(s), {recorder.frames_dropped} dropped", kind="recording",
+                         camera=session.camera.index, frames=recorder.frames_written, dropped=recorder.frames_dropped)
+
+    def start_pre_trigger(self, session, fps):
+        """Buffer the last seconds of raw frames for the trigger, if enabled"""
+        pre_seconds = self.trigger_options.get("pre_seconds")
+        if not pre_seconds:
+            return
+        self.stop_pre_trigger(session)
+        directory = self.trigger_options.get("directory", "triggers")
+        session.pre_trigger = PreTriggerRecorder(pre_seconds, self.trigger_options.get("post_seconds", 0),
+                                                 fps or 30.0, os.path.join(directory, session.label),
+                                                 self.trigger_options.get("ram_budget", RAM_BUDGET))
+        session.capture_worker.pre_trigger = session.pre_trigger
+
+    def stop_pre_trigger(self, session):
+        """Detach the ring buffer and finish the dumps still being written"""
+        if not session.pre_trigger:
+            return
+        session.capture_worker.pre_trigger = None
+        pre_trigger, session.pre_trigger = session.pre_trigger, None
+        for dump in pre_trigger.close():
+            self.log_trigger_dump(dump)
+
+    @pyqtSlot()
+    def trigger(self, post_seconds=None):
+        """Save the buffered frames and the next seconds of every camera without pausing capture
+
+        Returns the TriggerDumps being written, empty when no camera runs
+        with a pre-trigger buffer.
+        """
+        dumps = []
+        for session in self.sessions:
+            if not session.pre_trigger:
+                continue
+            ring = session.pre_trigger.ring
+            buffered, spilled = len(ring), " (memory-mapped)" if ring.spilled else ""
+            dump = session.pre_trigger.trigger(post_seconds)
+            self.log_message(f"Trigger: saving {buffered} buffered frame(s){spilled} of {session.name} and the "
+                             f"next {dump.post_seconds:g} s to {dump.path}")
+            dumps.append(dump)
+        return dumps
+
+    def log_trigger_dump(self, dump):
+        if dump.error:
+            self.log_message(f"Trigger dump failed: {dump.error}", "error", "trigger", path=dump.path)
+        else:
+            self.log_message(f"Trigger dump written: {dump.frames_written} frame(s) in {dump.path}", kind="trigger",
+                             path=dump.path, frames=dump.frames_written)
+
+    def frame_budget(self, fps):
+        """Milliseconds processing may take per frame before adaptive mode steps down"""
+        return self.frame_budget_ms or 1000 / (fps or 30.0)
+
+    @pyqtSlot(bool)
+    def set_adaptive(self, enabled):
+        """Turn adaptive resolution on or off for all cameras"""
+        self.adaptive = enabled
+        for session in self.sessions:
+            worker = session.pipeline_worker
+            if enabled:
+                worker.adaptive = AdaptiveLevel(self.frame_budget(session.fps), session.pipeline.level)
+            else:
+                worker.adaptive = None
+                session.pipeline.set_level(self.pipeline.level)
+        self.log_message(f"Adaptive resolution {'on' if enabled else 'off'}")
+
+    def change_detector(self):
+        return ChangeDetector(self.change_options.get("threshold", CHANGE_THRESHOLD),
+                              self.change_options.get("area", CHANGE_AREA))
+
+    @pyqtSlot(bool)
+    def set_skip_unchanged(self, enabled):
+        """Turn reusing the last output for unchanged frames on or off for all cameras"""
+        for session in self.sessions:
+            session.pipeline_worker.change_detector = self.change_detector() if enabled else None
+        self.log_message(f"Skipping unchanged frames {'on' if enabled else 'off'}")
+
+    def select_roi(self, rect):
+        """Process only the part of a camera image inside ``rect`` of the video widget"""
+        for session, cell in zip(self.sessions, self.video_frame.cells()):
+            if session.last_frame is None:
+                continue
+            height, width = session.last_frame.shape[:2]
+            x, y, shown_w, shown_h = fit_rect((width, height), cell)
+            if not QRect(x, y, shown_w, shown_h).contains(rect.center()):
+                continue
+
+            # The image shown covers the current region of interest, or the whole frame
+            roi_x, roi_y, roi_w, roi_h = session.pipeline.roi or (0, 0) + session.resolution
+            roi_w, roi_h = min(roi_w, session.resolution[0] - roi_x), min(roi_h, session.resolution[1] - roi_y)
+            left = min(max((rect.left() - x) / shown_w, 0.0), 1.0)
+            top = min(max((rect.top() - y) / shown_h, 0.0), 1.0)
+            right = min(max((rect.right() - x) / shown_w, 0.0), 1.0)
+            bottom = min(max((rect.bottom() - y) / shown_h, 0.0), 1.0)
+            roi = (roi_x + int(left * roi_w), roi_y + int(top * roi_h),
+                   int((right - left) * roi_w), int((bottom - top) * roi_h))
+            if roi[2] < MIN_ROI_SIZE or roi[3] < MIN_ROI_SIZE:
+                self.log_message(f"Region of interest too small: {roi[2]} x {roi[3]}")
+                return
+            session.pipeline.set_roi(roi)
+            self.reprocess_paused()
+            self.log_message(f"Region of interest of {session.name}: {roi[2]} x {roi[3]} at ({roi[0]}, {roi[1]})")
+            return
+
+    @pyqtSlot()
+    def reset_roi(self):
+        """Process the whole frame of every camera again"""
+        for session in self.sessions:
+            session.pipeline.set_roi(None)
+        self.reprocess_paused()
+        self.log_message("Region of interest reset")
+
+    def on_param_changed(self, value_label, value):
+        """Show a slider value and restart the debounce timer"""
+        value_label.setText(str(value))
+        self.param_timer.start()
+
+    @pyqtSlot()
+    def apply_params(self):
+        """Apply the slider values to the pipelines of all cameras
+
+        Paused cameras process their frozen frame again; as only the changed
+        stages rerun, moving a Canny threshold reuses the cached blur.
+        """
+        changes = {}
+        if self.canny_stage:
+            changes[self.canny_stage] = {"low": self.param_sliders["low"].value(),
+                                         "high": self.param_sliders["high"].value(),
+                                         "aperture": 2 * self.param_sliders["aperture"].value() + 1}
+        if self.blur_stage:
+            changes[self.blur_stage] = {"ksize": 2 * self.param_sliders["ksize"].value() + 1}
+        for pipeline in [self.pipeline] + [session.pipeline for session in self.sessions]:
+            for name, params in changes.items():
+                pipeline.set_params(name, **params)
+        self.reprocess_paused()
+        self.log_message("Parameters: " + ", ".join(f"{name} {params}" for name, params in changes.items()))
+
+    def reprocess_paused(self):
+        """Run the frozen frames of paused cameras through their changed pipelines"""
+        for session in self.sessions:
+            if session.pipeline_worker.paused:
+                session.pipeline_worker.reprocess()
+
+    @pyqtSlot(bool)
+    def toggle_pause(self, paused):
+        """Freeze the displayed frames, capture and recording carry on"""
+        for session in self.sessions:
+            session.pipeline_worker.paused = paused
+        self.pause_button.setText("Resume" if paused else "Pause")
+        self.log_message("Display paused" if paused else "Display resumed")
+
+    @pyqtSlot(str)
+    def change_schedule(self, policy):
+        """Switch the scheduling policy of all cameras"""
+        for session in self.sessions:
+            skipped = session.capture_worker.scheduler.set_policy(policy)
+            if skipped:
+                session.telemetry.record_skipped(skipped)
+        n = self.schedule_options.get("n", 2)
+        self.log_message(f"Schedule: {policy}{f' (1 in {n} frames)' if policy == 'nth' else ''}")
+
+    @pyqtSlot(str)
+    def change_view(self, view):
+        """Switch the displayed pipeline output of all cameras"""
+        self.pipeline.set_display(view)
+        for session in self.sessions:
+            session.pipeline.set_display(view)
+        self.reprocess_paused()
+        self.log_message(f"View: {view} ({len(self.pipeline.plan())} stage(s))")
+
+    def change_scaling(self, mode):
+        """Scale the displayed frames smoothly or to the nearest pixel"""
+        self.video_frame.set_smooth(mode == "smooth")
+        self.log_message(f"Display scaling: {mode}")
+
+    def save_inventory(self):
+        """Write the camera inventory; if that fails it is kept in memory only"""
+        if not self.inventory.save():
+            self.log_message(f"Could not save the camera inventory: {self.inventory.error}", "warning",
+                             "discovery", path=self.inventory.path)
+
+    def remember_capture_mode(self, session):
+        """Store the mode of a camera once it has delivered a frame"""
+        if session.mode and is_device(session.camera):
+            self.inventory.set_capture_mode(session.camera.device_id, session.mode)
+            self.save_inventory()
+
+    def on_capture_prepared(self, session, result):
+        """Take over the capture mode a capture worker read, and record a negotiated one"""
+        if session not in self.sessions:
+            return
+        mode, prepared = result
+        negotiated = self.capture_target and isinstance(session.cap, DeviceSource)
+        if negotiated:
+            # The negotiated mode carries the measured frame rate
+            mode, modes = prepared
+        session.mode = mode
+        session.resolution = (mode.width, mode.height)
+        if session.pipeline_worker.adaptive:
+            session.pipeline_worker.adaptive.budget_ms = self.frame_budget(mode.fps)
+        if session.pre_trigger and (mode.fps or 30.0) != session.pre_trigger.fps:
+            # Size the ring for the frame rate the camera actually delivers
+            self.start_pre_trigger(session, mode.fps)
+        if not negotiated:
+            return
+
+        self.inventory.set_negotiated_mode(session.camera.device_id, self.capture_target, mode, modes)
+        self.save_inventory()
+
+        if modes is None:
+            self.log_message(f"Capture mode of {session.name} (cached): {mode.fourcc} {mode.width}x{mode.height} "
+                             f"@ {mode.fps:g} fps")
+        else:
+            self.log_message(f"Capture mode of {session.name} for {self.capture_target}: {mode.fourcc} "
+                             f"{mode.width}x{mode.height} @ {mode.fps:g} fps, chosen from {len(modes)} mode(s)")
+            self.statusBar.showMessage(f"Camera started: {session.name}")
+
+    def on_capture_ended(self, session):
+        """Close a recorded source that reached its end"""
+        self.log_message(f"{session.name}: end of stream", kind="camera", camera=session.camera.index)
+        self.end_session(session)
+
+    def on_capture_failed(self, session, message):
+        """Handle a failure reported by the capture or pipeline worker of one camera"""
+        self.log_message(f"{session.name}: {message}", "error", "camera", camera=session.camera.index)
+        self.end_session(session)
+
+    def end_session(self, session):
+        """Close a camera that stopped delivering frames, the whole view if it was the last one"""
+        if session not in self.sessions:
+            return
+        if len(self.sessions) == 1:
+            self.stop_camera()
+        else:
+            self.close_session(session)
+            self.show_frames()
+
     @pyqtSlot()
     def update_status(self):
         """Update the status information periodically"""
         self.update_status_info()
-    
+        for session in self.sessions:
+            if session.pre_trigger:
+                for dump in session.pre_trigger.finished():
+                    self.log_trigger_dump(dump)
+            if self.metrics_exporter:
+                self.metrics_exporter.maybe_export(session.telemetry.snapshot(), key=session.label,
+                                                   camera=session.camera.index, view=self.pipeline.display)
+
     def update_status_info(self):
-        """Update the status information panel"""
-        status_text = ""
-        
+        """Update the status information panel, only fields whose text changed are redrawn"""
+        fields = []
+
         # Camera connection status
-        if self.cap and self.cap.isOpened():
-            camera_name = self.camera_combo.currentText().split(" (Index:")[0]
-            status_text += f"Connected to: {camera_name}\n"
-            status_text += f"Camera index: {self.current_camera_index}\n"
-            status_text += f"Resolution: {self.resolution[0]} x {self.resolution[1]}\n"
-            status_text += f"FPS: {self.fps:.2f}\n"
-            
-            # Add more camera properties if available
-            exposure = self.cap.get(cv2.CAP_PROP_EXPOSURE)
-            brightness = self.cap.get(cv2.CAP_PROP_BRIGHTNESS)
-            contrast = self.cap.get(cv2.CAP_PROP_CONTRAST)
-            
-            status_text += f"Exposure: {exposure}\n"
-            status_text += f"Brightness: {brightness}\n"
-            status_text += f"Contrast: {contrast}\n"
-            
-            # Runtime
-            runtime = time.time() - self.start_time
-            hours = int(runtime // 3600)
-            minutes = int((runtime % 3600) // 60)
-            seconds = int(runtime % 60)
-            status_text += f"Runtime: {hours:02d}:{minutes:02d}:{seconds:02d}\n"
-            
+        if self.sessions:
+            fields.append(("running", f"Cameras running: {len(self.sessions)}"))
+            fields.append(("view", f"View: {self.pipeline.display}"))
+            fields.append(("processing", f"Processing: {f'{self.workers} worker process(es)' if self.workers else 'inline'}"))
+
+            for session in self.sessions:
+                def field(key, text, label=session.label):
+                    fields.append((f"{label}.{key}", text))
+
+                field("name", f"\nConnected to: {session.name}")
+                field("index", f"Camera index: {session.camera.index}")
+                field("resolution", f"Resolution: {session.resolution[0]} x {session.resolution[1]}")
+                tiler = session.pipeline.tiler
+                if tiler and not self.workers:
+                    check = f", {tiler.mismatch:.2%} off in check {tiler.checks}" if tiler.checks else ""
+                    field("tiles", f"Tiles: {tiler.tile_size} px, {tiler.dirty_fraction:.0%} dirty{check}")
+                if session.pipeline.roi:
+                    field("roi", "ROI: {2} x {3} at ({0}, {1})".format(*session.pipeline.roi))
+                adaptive = session.pipeline_worker.adaptive
+                if adaptive:
+                    field("level", f"Pyramid level: {session.pipeline.level} (adaptive, "
+                                   f"{adaptive.average_ms or 0:.1f} of {adaptive.budget_ms:.1f} ms, "
+                                   f"{adaptive.changes} change(s))")
+                elif session.pipeline.level:
+                    field("level", f"Pyramid level: {session.pipeline.level}")
+
+                # Rolling metrics over the last few seconds
+                metrics = session.telemetry.snapshot()
+                field("capture_fps", f"Capture FPS: {metrics['capture_fps']:.2f}")
+                field("processing_fps", f"Processing FPS: {metrics['processing_fps']:.2f}")
+                field("display_fps", f"Display FPS: {metrics['display_fps']:.2f}")
+                field("dropped", f"Dropped: {metrics['dropped']}")
+                scheduler = session.capture_worker.scheduler
+                field("schedule", f"Schedule: {scheduler.policy}, {metrics['skipped']} skipped, "
+                                  f"{scheduler.queued} queued")
+                if session.pipeline_worker.change_detector:
+                    field("unchanged", f"Unchanged: {metrics['unchanged']} frame(s) reused, "
+                                       f"{metrics['unchanged_rate']:.0%} of recent frames")
+                if session.recorder:
+                    recorder = session.recorder
+                    field("recording", f"Recording: {recorder.frames_written} written, "
+                                       f"{recorder.frames_dropped} dropped, "
+                                       f"queue {recorder.queued}/{recorder.queue_size}")
+                    if recorder.error:
+                        field("recording_error", f"Recording error: {recorder.error}")
+                if session.pre_trigger:
+                    ring = session.pre_trigger.ring
+                    field("pre_trigger", f"Pre-trigger buffer: {len(ring)}/{ring.capacity} frame(s)"
+                                         f"{' memory-mapped' if ring.spilled else ''}, "
+                                         f"{session.pre_trigger.pending} dump(s) pending")
+                for stage, latency in metrics["stages_ms"].items():
+                    field(f"stage.{stage}", f"  {stage}: p50 {latency['p50']:.1f} / p95 {latency['p95']:.1f} / "
+                                            f"p99 {latency['p99']:.1f} ms")
+
+                # Camera properties, as last polled by the capture worker
+                for name in session.properties.properties:
+                    field(name, self.property_text(name, session.properties.get(name)))
+
+                # Runtime
+                runtime = time.time() - session.start_time
+                hours = int(runtime // 3600)
+                minutes = int((runtime % 3600) // 60)
+                seconds = int(runtime % 60)
+                field("runtime", f"Runtime: {hours:02d}:{minutes:02d}:{seconds:02d}")
+
         else:
-            status_text += "No active camera connection\n"
-            
+            fields.append(("connection", "No active camera connection"))
+
             if self.cameras:
-                status_text += f"Available cameras: {len(self.cameras)}\n"
-                for i, (idx, name) in enumerate(self.cameras):
-                    status_text += f"  • {name} (Index: {idx})\n"
+                fields.append(("available", f"Available cameras: {len(self.cameras)}"))
+                for idx, name, device_id in self.cameras:
+                    fields.append((f"camera.{device_id}", f"  • {name} (Index: {idx})"))
+            elif not self.discovery_started or (self.discovery_worker and self.discovery_worker.isRunning()):
+                fields.append(("available", "Scanning for cameras..."))
             else:
-                status_text += "No cameras detected\n"
-            
-        self.status_text.setText(status_text)
-    
-    def log_message(self, message):
-        """Add a message to the log"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] {message}"
-        self.log_text.append(log_entry)
-    
-    def resizeEvent(self, event):
-        """Handle window resize event"""
-        QMainWindow.resizeEvent(self, event)
-        # If we have a current frame, rescale it to fit the new size
-        if self.cap and self.cap.isOpened():
-            self.update_frame()
+                fields.append(("available", "No cameras detected"))
+
+        if self.startup_ms:
+            fields.append(("startup", "\nStartup: " + ", ".join(
+                f"{name.replace('_', ' ')} {ms:.0f} ms" for name, ms in self.startup_ms.items())))
+
+        self.status_panel.set_fields(fields)
+
+    @staticmethod
+    def property_text(name, value):
+        return f"{name.capitalize()}: {'...' if value is None else value}"
+
+    def on_properties_changed(self, session, changes):
+        """Show camera property changes reported by a capture worker"""
+        if session not in self.sessions:
+            return
+        for name, value in changes.items():
+            self.status_panel.set_field(f"{session.label}.{name}", self.property_text(name, value))
+            # The property controls follow the first camera
+            if session is self.sessions[0] and name in self.property_spins:
+                spin = self.property_spins[name]
+                spin.blockSignals(True)
+                spin.setValue(value)
+                spin.blockSignals(False)
+
+    def set_camera_property(self, name, value):
+        """Queue a property write for every camera, sent from the capture threads"""
+        for session in self.sessions:
+            session.properties.set(name, value)
+
+    def log_message(self, message, level="info", kind="app", **fields):
+        """Add an event to the log, it is shown with the next flush"""
+        self.event_log.add(message, level, kind, **fields)
+
+    @pyqtSlot()
+    def flush_log(self):
+        """Append the events logged since the last flush to the log view"""
+        events = self.event_log.take_new()
+        if events:
+            self.log_text.appendPlainText("\n".join(format_event(event) for event in events))
     
     def closeEvent(self, event):
         """Clean up resources when window is closed"""
         self.stop_camera()
+        if self.discovery_worker:
+            self.discovery_worker.wait()
+        self.event_log.close()
         event.accept()
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = WebcamTest()
+    parser = argparse.ArgumentParser(description="Webcam test viewer")
+    parser.add_argument("--pipeline", help="JSON pipeline config file (default: gray, blur, Canny)")
+    parser.add_argument("--view", help="pipeline output to display at startup, e.g. source or edges")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="run the pipeline on this many worker processes (default: 0, inline)")
+    parser.add_argument("--metrics-file", help="append rolling metrics to this JSON lines file")
+    parser.add_argument("--metrics-interval", type=float, default=5.0,
+                        help="seconds between metrics records (default: 5)")
+    parser.add_argument("--source", action="append",
+                        help="frame source instead of a camera: device:<index>, file:<path>, "
+                             "dir:<path>[@<fps>] or synthetic[:<width>x<height>[@<fps>]]; "
+                             "repeat to run several sources side by side")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay speed of recorded sources, 0 is as fast as possible (default: 1)")
+    parser.add_argument("--loop", action="store_true", help="restart recorded sources when they end")
+    parser.add_argument("--capture-target", default="none",
+                        help="capture mode to negotiate with live cameras: max_fps, min_cpu or max_resolution, "
+                             "optionally :<min height>, e.g. max_fps:720; probing the modes can take a while "
+                             "on the first start of a camera (default: none, keeps the driver default)")
+    parser.add_argument("--record-dir", default="recordings", help="directory for recordings (default: recordings)")
+    parser.add_argument("--record-queue", type=int, default=64,
+                        help="frames the encoder queue holds before the overflow policy applies (default: 64)")
+    parser.add_argument("--record-overflow", choices=OVERFLOW_POLICIES, default="drop_oldest",
+                        help="what to do when the encoder queue is full (default: drop_oldest)")
+    parser.add_argument("--segment-seconds", type=float, help="start a new recording file after this many seconds")
+    parser.add_argument("--segment-mb", type=float, help="start a new recording file after this many megabytes")
+    parser.add_argument("--pre-trigger", type=float, default=0,
+                        help="seconds of raw frames kept for the Trigger button (default: 0, disabled)")
+    parser.add_argument("--post-trigger", type=float, default=5.0,
+                        help="seconds recorded after a trigger (default: 5)")
+    parser.add_argument("--trigger-dir", default="triggers", help="directory for trigger dumps (default: triggers)")
+    parser.add_argument("--ring-ram-mb", type=float, default=RAM_BUDGET / 2**20,
+                        help="larger pre-trigger buffers are memory-mapped to a file in the trigger "
+                             f"directory (default: {RAM_BUDGET // 2**20})")
+    parser.add_argument("--schedule", choices=SCHEDULE_POLICIES, default="latest",
+                        help="which captured frames are processed: latest drops stale frames, every processes "
+                             "all of them, nth every n-th one (default: latest)")
+    parser.add_argument("--nth", type=int, default=2, help="frame interval of the nth schedule (default: 2)")
+    parser.add_argument("--schedule-queue", type=int, default=QUEUE_SIZE,
+                        help=f"frames the every schedule queues before capture waits (default: {QUEUE_SIZE})")
+    parser.add_argument("--display-fps", type=float, default=DISPLAY_FPS,
+                        help=f"highest rate the video is repainted at, independent of the cameras (default: {DISPLAY_FPS})")
+    parser.add_argument("--scaling", choices=SCALING_MODES, default="smooth",
+                        help="smooth or fast (nearest pixel) scaling of the displayed frames (default: smooth)")
+    parser.add_argument("--property-interval", type=float, default=POLL_INTERVAL,
+                        help=f"seconds between polls of each camera property (default: {POLL_INTERVAL:g})")
+    parser.add_argument("--event-log", help="also write events to this JSON lines file, rotated by size")
+    parser.add_argument("--event-log-mb", type=float, default=LOG_MAX_BYTES / 2**20,
+                        help=f"size at which the event log file is rotated (default: {LOG_MAX_BYTES // 2**20})")
+    parser.add_argument("--event-log-backups", type=int, default=LOG_BACKUPS,
+                        help=f"rotated event log files to keep (default: {LOG_BACKUPS})")
+    parser.add_argument("--event-capacity", type=int, default=EVENT_CAPACITY,
+                        help=f"events kept in memory and shown in the log (default: {EVENT_CAPACITY})")
+    parser.add_argument("--skip-unchanged", action="store_true",
+                        help="reuse the last processed image while the camera image does not change")
+    parser.add_argument("--change-threshold", type=float, default=CHANGE_THRESHOLD,
+                        help="gray levels a thumbnail pixel has to change by to count as a change "
+                             f"(default: {CHANGE_THRESHOLD})")
+    parser.add_argument("--change-area", type=float, default=CHANGE_AREA,
+                        help=f"fraction of thumbnail pixels that has to change (default: {CHANGE_AREA})")
+    parser.add_argument("--roi", help="process only this region of every frame, as <x>,<y>,<width>,<height>")
+    parser.add_argument("--level", type=int, default=0,
+                        help="pyramid level to process at, every level halves the width and height (default: 0)")
+    parser.add_argument("--tiles", type=int,
+                        help="only reprocess changed square tiles of this many pixels, e.g. 64")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="lower the pyramid level while processing is slower than the frame rate")
+    parser.add_argument("--frame-budget-ms", type=float,
+                        help="processing time per frame adaptive mode aims for (default: the camera frame interval)")
+    args, qt_args = parser.parse_known_args()
+
+    capture_target = None if args.capture_target == "none" else args.capture_target
+    if capture_target:
+        parse_target(capture_target)
+
+    pipeline = Pipeline.from_config(args.pipeline) if args.pipeline else Pipeline.from_dict(DEFAULT_PIPELINE)
+    if args.view:
+        pipeline.set_display(args.view)
+    if args.roi:
+        pipeline.set_roi(args.roi.split(","))
+    pipeline.set_level(args.level)
+    if args.tiles:
+        pipeline.set_tiles(args.tiles)
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    metrics_exporter = MetricsExporter(args.metrics_file, args.metrics_interval) if args.metrics_file else None
+    record_options = {
+        "directory": args.record_dir,
+        "queue_size": args.record_queue,
+        "overflow": args.record_overflow,
+        "segment_seconds": args.segment_seconds,
+        "segment_bytes": int(args.segment_mb * 2**20) if args.segment_mb else None,
+    }
+    trigger_options = {
+        "pre_seconds": args.pre_trigger,
+        "post_seconds": args.post_trigger,
+        "directory": args.trigger_dir,
+        "ram_budget": int(args.ring_ram_mb * 2**20),
+    }
+    event_log = EventLog(args.event_capacity, args.event_log, int(args.event_log_mb * 2**20), args.event_log_backups)
+    window = WebcamTest(pipeline, args.workers, metrics_exporter, args.source, args.speed, args.loop,
+                        capture_target, record_options, trigger_options, args.adaptive, args.frame_budget_ms,
+                        {"policy": args.schedule, "n": args.nth, "queue_size": args.schedule_queue},
+                        args.property_interval, event_log,
+                        {"enabled": args.skip_unchanged, "threshold": args.change_threshold,
+                         "area": args.change_area},
+                        {"max_fps": args.display_fps, "smooth": args.scaling == "smooth"})
     window.show()
     sys.exit(app.exec())
@@ -2,40 +2,8 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QLabel, QComboBox, QPushButton, QWidget
 
 import sys
-import wmi
-import cv2
 
-def list_camera_devices_wmi():
-    
-        # Get the WMI service
-        c = wmi.WMI()
-        
-        # Query all video devices
-        wmi_devices = c.Win32_PnPEntity(PNPClass="Camera")
-        
-        print(f"Found {len(wmi_devices)} imaging devices via WMI:")
-        for i, device in enumerate(wmi_devices):
-            print(f"Device {i}: {device.Name}")
-        
-        # Now check which ones OpenCV can access
-        available_cameras = []
-        max_to_check = 10  # Check reasonable number of indices
-        
-        for i in range(max_to_check):
-            cap = cv2.VideoCapture(i, cv2.CAP_DSHOW)
-            if cap.isOpened():
-                ret, frame = cap.read()
-                if ret:
-                    # We have a working camera at this index
-                    print(f"\nOpenCV camera at index {i} is working")
-                    # Try to match it with a WMI device (imperfect, but provides a guess)
-                    if i < len(wmi_devices):
-                        available_cameras.append((i, wmi_devices[i].Name))
-                    else:
-                        available_cameras.append((i, f"Unknown Camera {i}"))
-                cap.release()
-        
-        return available_cameras
+from camera_discovery import list_camera_devices
 
 
 class WebcamTest(QMainWindow):
@@ -56,9 +24,9 @@ class WebcamTest(QMainWindow):
         self.camera_dropdown = QComboBox()
         layout.addWidget(self.camera_dropdown)
 
-        self.cameras = list_camera_devices_wmi()
+        self.cameras = list_camera_devices()
         if self.cameras:
-            for index, name in self.cameras:
+            for index, name, _ in self.cameras:
                 if name.startswith("Unknown Camera"):
                     break
                 # Add both the index and name to the dropdown